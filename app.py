@@ -5,25 +5,325 @@ author_url: https://downchurch.studio/
 version: 2.0
 """
 
-import os, re, json
+import os, re, sys, json, math, time, socket, asyncio, bisect, hashlib, argparse, threading
+from contextlib import contextmanager
+from functools import lru_cache
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict, Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from dotenv import load_dotenv
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
 load_dotenv()
 
 OLLAMA_CLOUD_MODEL = "gpt-oss:120b-cloud"
 OLLAMA_CLOUD_API_KEY = os.getenv("OLLAMA_CLOUD_API_KEY", "").strip()
 OLLAMA_CLOUD_BASE_URL = os.getenv("OLLAMA_CLOUD_BASE_URL", "https://api.ollama.com").rstrip("/")
 OLLAMA_TIMEOUT_SEC = float(os.getenv("OLLAMA_TIMEOUT_SEC", "180"))
+OLLAMA_CONNECT_TIMEOUT_SEC = float(os.getenv("OLLAMA_CONNECT_TIMEOUT_SEC", "10"))
+OLLAMA_POOL_SIZE = max(1, int(os.getenv("OLLAMA_POOL_SIZE", "16")))
+OLLAMA_MAX_RETRIES = max(0, int(os.getenv("OLLAMA_MAX_RETRIES", "3")))
+OLLAMA_RETRY_BACKOFF_SEC = float(os.getenv("OLLAMA_RETRY_BACKOFF_SEC", "1"))
+OLLAMA_RETRY_BACKOFF_MAX_SEC = 120
+OLLAMA_RETRY_STATUSES = (429, 500, 502, 503, 504)
+OLLAMA_NUM_CTX_MIN = max(512, int(os.getenv("OLLAMA_NUM_CTX_MIN", "2048")))
+OLLAMA_NUM_CTX_MAX = max(OLLAMA_NUM_CTX_MIN, int(os.getenv("OLLAMA_NUM_CTX_MAX", "8192")))
+RESPONSE_TOKEN_RESERVE = max(0, int(os.getenv("GAMMA_RESPONSE_TOKEN_RESERVE", "2048")))
+PROMPT_TOKEN_BUDGET = max(256, int(os.getenv("GAMMA_PROMPT_TOKEN_BUDGET", str(OLLAMA_NUM_CTX_MAX - RESPONSE_TOKEN_RESERVE))))
+OLLAMA_MAX_CONCURRENT_CALLS = max(1, int(os.getenv("OLLAMA_MAX_CONCURRENT_CALLS", "4")))
+OLLAMA_QUEUE_TIMEOUT_SEC = float(os.getenv("OLLAMA_QUEUE_TIMEOUT_SEC", "120"))
+MODEL_PRIORITY_INTERACTIVE = 0
+MODEL_PRIORITY_BACKGROUND = 10
 
 if not OLLAMA_CLOUD_API_KEY:
     raise RuntimeError("OLLAMA_CLOUD_API_KEY was not found in the .env file.")
 
 app = Flask(__name__)
 
+METRICS_ENABLED = os.getenv("GAMMA_METRICS", "1").strip().lower() in ("1", "true", "yes")
+METRIC_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+METRIC_DEFINITIONS = OrderedDict([
+    ("gamma_http_request_duration_seconds", ("histogram", "Time per request until the response body was sent.")),
+    ("gamma_http_requests_total", ("counter", "Requests per route, method and status.")),
+    ("gamma_stage_duration_seconds", ("histogram", "Time spent in internal processing stages.")),
+    ("gamma_cache_requests_total", ("counter", "Cache lookups per cache and result.")),
+    ("gamma_graph_fallbacks_total", ("counter", "Knowledge graphs left at the static analysis although model enrichment was requested.")),
+    ("gamma_model_request_duration_seconds", ("histogram", "Duration of upstream model calls.")),
+    ("gamma_model_requests_total", ("counter", "Upstream model calls per kind and HTTP status.")),
+    ("gamma_model_errors_total", ("counter", "Upstream model calls that failed, per kind and error.")),
+    ("gamma_model_tokens_total", ("counter", "Tokens reported by the model, per direction.")),
+    ("gamma_model_calls_active", ("gauge", "Model calls currently holding a slot.")),
+    ("gamma_model_calls_queued", ("gauge", "Model calls waiting for a slot."))
+])
+_metric_values = {}
+_metrics_lock = threading.Lock()
+
+def metric_labels(labels: dict) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def inc_metric(name: str, value: float = 1, **labels):
+    if not METRICS_ENABLED:
+        return
+
+    key = (name, metric_labels(labels))
+    with _metrics_lock:
+        _metric_values[key] = _metric_values.get(key, 0) + value
+
+def observe_metric(name: str, value: float, **labels):
+    if not METRICS_ENABLED:
+        return
+
+    key = (name, metric_labels(labels))
+    with _metrics_lock:
+        histogram = _metric_values.get(key)
+        if histogram is None:
+            histogram = _metric_values[key] = {"buckets": [0] * len(METRIC_LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+        index = bisect.bisect_left(METRIC_LATENCY_BUCKETS, value)
+        if index < len(METRIC_LATENCY_BUCKETS):
+            histogram["buckets"][index] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+@contextmanager
+def timed_stage(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_metric("gamma_stage_duration_seconds", time.perf_counter() - started, stage=stage)
+
+def escape_metric_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_metric_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_metric_label(value)}"' for name, value in labels) + "}"
+
+def format_metric_value(value: float) -> str:
+    return repr(float(value)) if math.isfinite(value) else ("+Inf" if value > 0 else "-Inf")
+
+def render_metrics() -> str:
+    queue = get_model_queue_stats()
+    with _metrics_lock:
+        values = {key: (dict(value, buckets=list(value["buckets"])) if isinstance(value, dict) else value) for key, value in _metric_values.items()}
+    values[("gamma_model_calls_active", ())] = queue["active"]
+    values[("gamma_model_calls_queued", ())] = queue["queued"]
+
+    lines = []
+    for name, (kind, help_text) in METRIC_DEFINITIONS.items():
+        series = sorted((labels, value) for (metric, labels), value in values.items() if metric == name)
+        if not series:
+            continue
+
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in series:
+            if kind != "histogram":
+                lines.append(f"{name}{format_metric_labels(labels)} {format_metric_value(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(METRIC_LATENCY_BUCKETS, value["buckets"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_metric_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{format_metric_labels(labels + (('le', '+Inf'),))} {value['count']}")
+            lines.append(f"{name}_sum{format_metric_labels(labels)} {format_metric_value(value['sum'])}")
+            lines.append(f"{name}_count{format_metric_labels(labels)} {value['count']}")
+
+    return "\n".join(lines) + "\n"
+
+def record_request_metrics(route: str, method: str, status: int, started: float):
+    observe_metric("gamma_http_request_duration_seconds", time.perf_counter() - started, route=route, method=method)
+    inc_metric("gamma_http_requests_total", route=route, method=method, status=status)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def track_request_metrics(response):
+    started = g.pop("request_started", None)
+    if METRICS_ENABLED and started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        method, status = request.method, response.status_code
+        if response.is_streamed:
+            # Streamed responses are only done once the server closes the body.
+            response.call_on_close(lambda: record_request_metrics(route, method, status, started))
+        else:
+            record_request_metrics(route, method, status, started)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled."}), 404
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+PROFILE_ROUTES = {route.strip() for route in os.getenv("GAMMA_PROFILE_ROUTES", "").split(",") if route.strip()}
+PROFILE_HEADER_ENABLED = os.getenv("GAMMA_PROFILE_HEADER", "0").strip().lower() in ("1", "true", "yes")
+PROFILE_HEADER = "X-Gamma-Profile"
+PROFILE_DIR = os.getenv("GAMMA_PROFILE_DIR", "").strip()
+PROFILE_INTERVAL_SEC = max(0.001, float(os.getenv("GAMMA_PROFILE_INTERVAL_MS", "5")) / 1000)
+PROFILE_MAX_SEC = float(os.getenv("GAMMA_PROFILE_MAX_SEC", "300"))
+PROFILE_KEEP = max(1, int(os.getenv("GAMMA_PROFILE_KEEP", "200")))
+PROFILE_HELPER_THREAD_PREFIXES = ("gamma-ingest",)
+PROFILE_NAME_PATTERN = re.compile(r"[^A-Za-z0-9_.-]+")
+
+def profile_output_dir() -> str:
+    return PROFILE_DIR or os.path.join(SUMMARY_STORE_DIR, "profiles")
+
+def should_profile_request(route: str) -> bool:
+    if PROFILE_HEADER_ENABLED and request.headers.get(PROFILE_HEADER, "").strip().lower() in ("1", "true", "yes"):
+        return True
+    return "*" in PROFILE_ROUTES or route in PROFILE_ROUTES
+
+def profile_frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def collapse_stack(frame) -> tuple:
+    stack = []
+    while frame is not None:
+        stack.append(profile_frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+def run_profile_sampler(profile: dict):
+    module_marker = f"({os.path.basename(__file__)}:"
+    deadline = profile["started"] + PROFILE_MAX_SEC
+
+    while time.perf_counter() < deadline:
+        frames = sys._current_frames()
+        frame = frames.get(profile["thread_id"])
+        if frame is not None:
+            profile["stacks"][collapse_stack(frame)] += 1
+            profile["samples"] += 1
+
+        # Summary ingest runs on pool threads while the request thread waits for it.
+        for thread in threading.enumerate():
+            if not thread.name.startswith(PROFILE_HELPER_THREAD_PREFIXES) or thread.ident not in frames:
+                continue
+            stack = collapse_stack(frames[thread.ident])
+            if any(module_marker in label for label in stack):
+                profile["stacks"][(thread.name.rsplit("_", 1)[0],) + stack] += 1
+
+        if profile["stop"].wait(PROFILE_INTERVAL_SEC):
+            break
+
+def start_request_profile(route: str) -> dict:
+    profile = {
+        "route": route,
+        "method": request.method,
+        "thread_id": threading.get_ident(),
+        "started": time.perf_counter(),
+        "started_at": time.time(),
+        "stacks": Counter(),
+        "samples": 0,
+        "stop": threading.Event()
+    }
+    profile["sampler"] = threading.Thread(target=run_profile_sampler, args=(profile,), name="gamma-profiler", daemon=True)
+    profile["sampler"].start()
+    return profile
+
+def prune_request_profiles(directory: str):
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".collapsed"))
+    for name in names[:-PROFILE_KEEP]:
+        for path in (os.path.join(directory, name), os.path.join(directory, name[:-len(".collapsed")] + ".json")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def finish_request_profile(profile: dict, project_dir: str, status: int) -> str:
+    profile["stop"].set()
+    profile["sampler"].join()
+    duration_ms = int((time.perf_counter() - profile["started"]) * 1000)
+    route_name = PROFILE_NAME_PATTERN.sub("_", profile["route"].strip("/")) or "index"
+    project_name = PROFILE_NAME_PATTERN.sub("_", os.path.basename(normalize_project_dir(project_dir)))[:40] if project_dir else "none"
+    stamp = datetime.fromtimestamp(profile["started_at"]).strftime("%Y%m%d-%H%M%S-%f")
+    name = f"{stamp}_{route_name}_{project_name}_{duration_ms}ms"
+
+    directory = profile_output_dir()
+    os.makedirs(directory, exist_ok=True)
+    lines = [f"{';'.join(stack)} {count}" for stack, count in profile["stacks"].most_common()]
+    write_file_atomic(os.path.join(directory, f"{name}.collapsed"), "\n".join(lines) + "\n")
+    write_file_atomic(os.path.join(directory, f"{name}.json"), json.dumps({
+        "route": profile["route"],
+        "method": profile["method"],
+        "status": status,
+        "project_dir": project_dir,
+        "started_at": datetime.fromtimestamp(profile["started_at"]).isoformat(timespec="milliseconds"),
+        "duration_ms": duration_ms,
+        "samples": profile["samples"],
+        "interval_ms": PROFILE_INTERVAL_SEC * 1000,
+        "pid": os.getpid()
+    }, indent=2))
+    prune_request_profiles(directory)
+    return name
+
+@app.before_request
+def start_request_profiling():
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    if should_profile_request(route):
+        g.request_profile = start_request_profile(route)
+
+@app.after_request
+def finish_request_profiling(response):
+    profile = g.pop("request_profile", None)
+    if profile is None:
+        return response
+
+    data = request.get_json(silent=True) if request.is_json else None
+    project_dir = data.get("project_dir") if isinstance(data, dict) else ""
+    project_dir = project_dir.strip() if isinstance(project_dir, str) else ""
+
+    def finish():
+        try:
+            return finish_request_profile(profile, project_dir, response.status_code)
+        except OSError as e:
+            app.logger.warning("Could not write request profile: %s", e)
+            return ""
+
+    if response.is_streamed:
+        # Streamed bodies keep running after this hook, so stop when the server closes them.
+        response.call_on_close(finish)
+    else:
+        name = finish()
+        if name:
+            response.headers[PROFILE_HEADER] = name
+    return response
+
 @app.route('/list-objects', methods=['POST'])
 def list_objects():
     data = request.json
@@ -87,16 +387,109 @@ def parse_event_filename(filename):
     return filename.replace(".gml", "").strip(), None
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
-COMBINED_CODE_FILENAME = "all_objects_combined.gml"
+SUMMARY_STORE_DIR = os.getenv("GAMMA_SUMMARY_STORE_DIR", os.path.join(APP_DIR, "summaries"))
+SUMMARY_CACHE_SIZE = max(1, int(os.getenv("GAMMA_SUMMARY_CACHE_SIZE", "8")))
+SUMMARY_MANIFEST_VERSION = 2
+SUMMARY_FILE_EXTENSIONS = (".gml", ".yml", ".yaml")
+OBJECT_DEFINITION_EXTENSION = ".yy"
+OBJECT_PARENT_PATTERN = re.compile(r'"parentObjectId"\s*:\s*\{\s*"name"\s*:\s*"([^"]+)"')
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_GML_KEY_PATTERN = re.compile(r"""^\s*["']?gml["']?\s*:""", re.MULTILINE)
+SUMMARY_INGEST_WORKERS = max(1, int(os.getenv("GAMMA_INGEST_WORKERS", "8")))
+
+_summary_cache = OrderedDict()
+_summary_cache_lock = threading.Lock()
+_summary_build_locks = {}
+_ingest_pool = ThreadPoolExecutor(max_workers=SUMMARY_INGEST_WORKERS, thread_name_prefix="gamma-ingest")
+
+
+@lru_cache(maxsize=256)
+def normalize_project_dir(project_dir: str) -> str:
+    return os.path.normcase(os.path.realpath((project_dir or "").strip()))
+
+
+@lru_cache(maxsize=256)
+def project_store_key(project_dir: str) -> str:
+    normalized = normalize_project_dir(project_dir)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def summary_store_paths(project_dir: str) -> tuple:
+    key = project_store_key(project_dir)
+    return (
+        os.path.join(SUMMARY_STORE_DIR, f"{key}.gml"),
+        os.path.join(SUMMARY_STORE_DIR, f"{key}.manifest.json")
+    )
 
 
-def build_all_objects_summary(project_dir: str) -> str:
-    objects_dir = os.path.join(project_dir, "objects")
-    if not os.path.isdir(objects_dir):
-        raise FileNotFoundError(f"Folder not found: {objects_dir}")
+def get_summary_build_lock(project_dir: str) -> threading.Lock:
+    key = project_store_key(project_dir)
+    with _summary_cache_lock:
+        return _summary_build_locks.setdefault(key, threading.Lock())
+
+
+@contextmanager
+def file_lock(lock_path: str):
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def project_store_lock(project_dir: str, name: str = "build"):
+    return file_lock(os.path.join(SUMMARY_STORE_DIR, "locks", f"{project_store_key(project_dir)}.{name}.lock"))
+
+
+def file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def cache_summary_text(summary_path: str, text: str, replace: bool = True, stamp=None) -> dict:
+    with _summary_cache_lock:
+        entry = _summary_cache.get(summary_path)
+        if entry is None or replace:
+            entry = {
+                "text": text,
+                "hash": hashlib.sha1(text.encode("utf-8")).hexdigest(),
+                "content_hash": summary_objects_hash(text),
+                "stamp": stamp
+            }
+            _summary_cache[summary_path] = entry
+
+        _summary_cache.move_to_end(summary_path)
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+
+        return entry
+
 
-    output_file = os.path.join(APP_DIR, COMBINED_CODE_FILENAME)
+def decode_summary_text(text: str) -> str:
+    return text.replace("\\r\\n", "\n").replace("\\n", "\n")
+
+
+def scan_object_event_files(objects_dir: str) -> tuple:
     obj_events = {}
+    definitions = {}
 
     for root, _, files in os.walk(objects_dir):
         rel = os.path.relpath(root, objects_dir).split(os.sep)
@@ -107,7 +500,12 @@ def build_all_objects_summary(project_dir: str) -> str:
 
         for fname in files:
             ext = os.path.splitext(fname)[1].lower()
-            if ext not in (".gml", ".yml", ".yaml"):
+            if ext == OBJECT_DEFINITION_EXTENSION and len(rel) == 1 and fname == f"{obj}{ext}":
+                definitions[obj] = os.path.join(root, fname)
+                obj_events.setdefault(obj, {})
+                continue
+
+            if ext not in SUMMARY_FILE_EXTENSIONS:
                 continue
 
             full = os.path.join(root, fname)
@@ -118,45 +516,376 @@ def build_all_objects_summary(project_dir: str) -> str:
                       .setdefault(event, []) \
                       .append((full, ext))
 
-    with open(output_file, "w", encoding="utf-8") as out:
-        out.write("// ======================================================\n")
-        out.write("// Combined GML code of all objects\n")
-        out.write(f"// Generated on: {datetime.now():%Y-%m-%d %H:%M:%S}\n")
-        out.write(f"// Project: {project_dir}\n")
-        out.write("// ======================================================\n\n")
-
-        for obj in sorted(obj_events):
-            out.write(f"// === Object: {obj} ===\n\n")
-            for event in sorted(obj_events[obj]):
-                out.write(f"// --- Event: {event} ---\n")
-                for path, ext in sorted(obj_events[obj][event], key=lambda x: x[0]):
-                    out.write(f"// File: {os.path.basename(path)}\n")
-                    if ext == ".gml":
-                        with open(path, "r", encoding="utf-8") as f:
-                            out.write(f.read().rstrip() + "\n\n")
-                    else:
-                        with open(path, "r", encoding="utf-8") as f:
-                            data = yaml.safe_load(f) or {}
-                        code = data.get("gml", "")
-                        out.write(code.rstrip() + "\n\n")
-
-            out.write("\n")
-
-        out.write("// === End of all objects ===\n")
+    return obj_events, definitions
 
-    return output_file
 
+def extract_yaml_gml(text: str, loader=None) -> str:
+    if not YAML_GML_KEY_PATTERN.search(text):
+        return ""
 
-def read_combined_summary() -> str:
-    summary_path = os.path.join(APP_DIR, COMBINED_CODE_FILENAME)
-    if not os.path.isfile(summary_path):
+    data = yaml.load(text, Loader=loader or YAML_LOADER) or {}
+    if not isinstance(data, dict):
         return ""
+    return data.get("gml", "") or ""
 
-    with open(summary_path, "r", encoding="utf-8") as f:
-        text = f.read()
 
-    text = text.replace("\\r\\n", "\n").replace("\\n", "\n")
-    return text
+def extract_object_parent(text: str) -> str:
+    match = OBJECT_PARENT_PATTERN.search(text)
+    return match.group(1).strip() if match else ""
+
+
+def read_event_code(path: str, ext: str) -> tuple:
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    digest = hashlib.sha1(raw).hexdigest()
+    text = raw.decode("utf-8")
+
+    if ext == ".gml":
+        return text, digest
+
+    if ext == OBJECT_DEFINITION_EXTENSION:
+        return extract_object_parent(text), digest
+
+    return extract_yaml_gml(text), digest
+
+
+def ingest_event_file(path: str, ext: str, cached, trust_cache: bool = False) -> tuple:
+    if trust_cache and cached:
+        return cached, False
+
+    st = os.stat(path)
+    if cached and cached["mtime"] == st.st_mtime_ns and cached["size"] == st.st_size:
+        return cached, False
+
+    code, digest = read_event_code(path, ext)
+    entry = {
+        "mtime": st.st_mtime_ns,
+        "size": st.st_size,
+        "hash": digest,
+        "code": code
+    }
+    return entry, not cached or cached["hash"] != digest
+
+
+def load_summary_manifest(manifest_path: str, project_dir: str) -> dict:
+    empty = {"version": SUMMARY_MANIFEST_VERSION, "project_dir": project_dir, "files": {}, "objects": {}}
+    if not os.path.isfile(manifest_path):
+        return empty
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty
+
+    if manifest.get("version") != SUMMARY_MANIFEST_VERSION or manifest.get("project_dir") != project_dir:
+        return empty
+
+    manifest.setdefault("files", {})
+    manifest.setdefault("objects", {})
+    return manifest
+
+
+def write_file_atomic(path: str, text: str):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def render_object_fragment(obj: str, events: dict, files: dict, definition: str = "") -> str:
+    parts = [f"// === Object: {obj} ===\n\n"]
+    parent = files[definition]["code"] if definition else ""
+    if parent:
+        parts.append(f"// Parent: {parent}\n\n")
+    for event in sorted(events):
+        parts.append(f"// --- Event: {event} ---\n")
+        for path, _ in sorted(events[event], key=lambda x: x[0]):
+            parts.append(f"// File: {os.path.basename(path)}\n")
+            parts.append(files[path]["code"].rstrip() + "\n\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+@timed_stage("summary_build")
+def build_all_objects_summary(project_dir: str, changed_paths=None) -> str:
+    objects_dir = os.path.join(project_dir, "objects")
+    if not os.path.isdir(objects_dir):
+        raise FileNotFoundError(f"Folder not found: {objects_dir}")
+
+    os.makedirs(SUMMARY_STORE_DIR, exist_ok=True)
+
+    with get_summary_build_lock(project_dir), project_store_lock(project_dir):
+        return _build_all_objects_summary(project_dir, objects_dir, changed_paths)
+
+
+def _build_all_objects_summary(project_dir: str, objects_dir: str, changed_paths=None) -> str:
+    output_file, manifest_file = summary_store_paths(project_dir)
+    normalized_dir = normalize_project_dir(project_dir)
+
+    manifest = load_summary_manifest(manifest_file, normalized_dir)
+    old_files = manifest["files"]
+    old_objects = manifest["objects"]
+    obj_events, definitions = scan_object_event_files(objects_dir)
+
+    sources = [
+        (path, ext)
+        for obj in sorted(obj_events)
+        for event in sorted(obj_events[obj])
+        for path, ext in sorted(obj_events[obj][event], key=lambda x: x[0])
+    ]
+    sources.extend((definitions[obj], OBJECT_DEFINITION_EXTENSION) for obj in sorted(definitions))
+
+    jobs = [
+        (path, ext, old_files.get(path), changed_paths is not None and path not in changed_paths)
+        for path, ext in sources
+    ]
+
+    if SUMMARY_INGEST_WORKERS > 1 and len(jobs) > 1:
+        results = list(_ingest_pool.map(lambda job: ingest_event_file(*job), jobs))
+    else:
+        results = [ingest_event_file(*job) for job in jobs]
+
+    files = {}
+    changed = False
+
+    for (path, _, _, _), (entry, file_changed) in zip(jobs, results):
+        files[path] = entry
+        changed = changed or file_changed
+
+    if set(files) != set(old_files):
+        changed = True
+
+    objects = {}
+    for obj in obj_events:
+        file_hashes = [
+            [path, files[path]["hash"]]
+            for entries in obj_events[obj].values()
+            for path, _ in entries
+        ]
+        if obj in definitions:
+            file_hashes.append([definitions[obj], files[definitions[obj]]["hash"]])
+        file_hashes.sort()
+
+        cached = old_objects.get(obj)
+        if cached and cached["files"] == file_hashes:
+            objects[obj] = cached
+        else:
+            objects[obj] = {
+                "files": file_hashes,
+                "fragment": render_object_fragment(obj, obj_events[obj], files, definitions.get(obj, ""))
+            }
+
+    manifest = {
+        "version": SUMMARY_MANIFEST_VERSION,
+        "project_dir": normalized_dir,
+        "files": files,
+        "objects": objects
+    }
+
+    if not changed and os.path.isfile(output_file):
+        if files != old_files:
+            write_file_atomic(manifest_file, json.dumps(manifest))
+        return output_file
+
+    parts = [
+        "// ======================================================\n",
+        "// Combined GML code of all objects\n",
+        f"// Generated on: {datetime.now():%Y-%m-%d %H:%M:%S}\n",
+        f"// Project: {project_dir}\n",
+        "// ======================================================\n\n"
+    ]
+    parts.extend(objects[obj]["fragment"] for obj in sorted(objects))
+    parts.append("// === End of all objects ===\n")
+    text = "".join(parts)
+
+    write_file_atomic(output_file, text)
+    write_file_atomic(manifest_file, json.dumps(manifest))
+    cache_summary_text(output_file, decode_summary_text(text), stamp=file_stamp(output_file))
+
+    return output_file
+
+
+@timed_stage("summary_read")
+def get_summary_entry(project_dir: str):
+    if not (project_dir or "").strip():
+        return None
+
+    summary_path, _ = summary_store_paths(project_dir.strip())
+    stamp = file_stamp(summary_path)
+
+    with _summary_cache_lock:
+        entry = _summary_cache.get(summary_path)
+        if entry is not None and entry["stamp"] == stamp:
+            _summary_cache.move_to_end(summary_path)
+            inc_metric("gamma_cache_requests_total", cache="summary", result="hit")
+            return entry
+
+    inc_metric("gamma_cache_requests_total", cache="summary", result="miss")
+    try:
+        with open(summary_path, "r", encoding="utf-8") as f:
+            text = decode_summary_text(f.read())
+    except FileNotFoundError:
+        return None
+
+    return cache_summary_text(summary_path, text, replace=entry is not None, stamp=stamp)
+
+
+def summary_content_hash(project_dir: str) -> str:
+    entry = get_summary_entry(project_dir)
+    return entry["hash"] if entry else ""
+
+
+PROJECT_WATCH_ENABLED = os.getenv("GAMMA_WATCH_PROJECTS", "0").strip().lower() in ("1", "true", "yes")
+PROJECT_WATCH_INTERVAL_SEC = float(os.getenv("GAMMA_WATCH_INTERVAL_SEC", "2"))
+PROJECT_WATCH_DEBOUNCE_SEC = 0.3
+
+_project_watchers = OrderedDict()
+_project_watchers_lock = threading.Lock()
+
+
+def is_summary_source_file(path: str) -> bool:
+    ext = os.path.splitext(path)[1].lower()
+    return ext in SUMMARY_FILE_EXTENSIONS or ext == OBJECT_DEFINITION_EXTENSION
+
+
+def collect_objects_signature(objects_dir: str) -> dict:
+    signature = {}
+    for root, _, files in os.walk(objects_dir):
+        for fname in files:
+            if not is_summary_source_file(fname):
+                continue
+            full = os.path.join(root, fname)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            signature[full] = (st.st_mtime_ns, st.st_size)
+    return signature
+
+
+def refresh_project_after_changes(project_dir: str, changed_paths: set):
+    previous_hash = summary_content_hash(project_dir)
+    build_all_objects_summary(project_dir, changed_paths)
+    schedule_condensed_summaries(project_dir)
+
+    objects_dir = os.path.join(project_dir, "objects")
+    changed_events = set()
+    for path in changed_paths:
+        rel = os.path.relpath(path, objects_dir).split(os.sep)
+        if len(rel) < 2 or os.path.splitext(path)[1].lower() == OBJECT_DEFINITION_EXTENSION:
+            return
+        changed_events.add((rel[0], event_from_filename(path)))
+
+    for obj, event in sorted(changed_events):
+        if update_project_graph_for_event(project_dir, obj, event, previous_hash) is None:
+            return
+        previous_hash = summary_content_hash(project_dir)
+
+
+def run_project_watcher(project_dir: str, watcher: dict):
+    objects_dir = os.path.join(project_dir, "objects")
+    stop_event = watcher["stop"]
+    wake_event = watcher["wake"]
+    signature = None if watcher["observer"] else collect_objects_signature(objects_dir)
+
+    while not stop_event.is_set():
+        if watcher["observer"]:
+            wake_event.wait()
+            if stop_event.wait(PROJECT_WATCH_DEBOUNCE_SEC):
+                break
+            wake_event.clear()
+            with _project_watchers_lock:
+                changed_paths = set(watcher["pending"])
+                watcher["pending"].clear()
+        else:
+            if stop_event.wait(PROJECT_WATCH_INTERVAL_SEC):
+                break
+            current = collect_objects_signature(objects_dir)
+            changed_paths = {
+                path for path in set(signature) | set(current)
+                if signature.get(path) != current.get(path)
+            }
+            signature = current
+
+        if not changed_paths:
+            continue
+
+        try:
+            refresh_project_after_changes(project_dir, changed_paths)
+        except Exception:
+            app.logger.exception("Project watcher failed to refresh %s", project_dir)
+
+
+def start_project_observer(objects_dir: str, watcher: dict):
+    def on_any_event(event):
+        paths = [getattr(event, "src_path", ""), getattr(event, "dest_path", "")]
+        paths = [path for path in paths if path and is_summary_source_file(path)]
+        if not paths:
+            return
+        with _project_watchers_lock:
+            watcher["pending"].update(paths)
+        watcher["wake"].set()
+
+    handler = FileSystemEventHandler()
+    handler.on_any_event = on_any_event
+
+    observer = Observer()
+    observer.schedule(handler, objects_dir, recursive=True)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+
+def stop_project_watcher(watcher: dict):
+    watcher["stop"].set()
+    watcher["wake"].set()
+    if watcher["observer"]:
+        watcher["observer"].stop()
+
+
+def watch_project(project_dir: str):
+    if not PROJECT_WATCH_ENABLED:
+        return
+
+    objects_dir = os.path.join(project_dir, "objects")
+    if not os.path.isdir(objects_dir):
+        return
+
+    key = project_store_key(project_dir)
+    with _project_watchers_lock:
+        if key in _project_watchers:
+            _project_watchers.move_to_end(key)
+            return
+
+        watcher = {
+            "stop": threading.Event(),
+            "wake": threading.Event(),
+            "pending": set(),
+            "observer": None
+        }
+        _project_watchers[key] = watcher
+
+        evicted = []
+        while len(_project_watchers) > SUMMARY_CACHE_SIZE:
+            evicted.append(_project_watchers.popitem(last=False)[1])
+
+    for old in evicted:
+        stop_project_watcher(old)
+
+    if Observer is not None:
+        try:
+            watcher["observer"] = start_project_observer(objects_dir, watcher)
+        except Exception:
+            app.logger.warning("Falling back to polling for %s", objects_dir)
+
+    threading.Thread(
+        target=run_project_watcher,
+        args=(project_dir, watcher),
+        name=f"gamma-watch-{key}",
+        daemon=True
+    ).start()
 
 @app.route('/object-events', methods=['POST'])
 def object_events():
@@ -214,6 +943,8 @@ def build_project_summary():
 
     try:
         output_file = build_all_objects_summary(project_dir)
+        watch_project(project_dir)
+        schedule_condensed_summaries(project_dir)
         return jsonify({
             "status": "Project summary successfully created.",
             "output_file": output_file,
@@ -222,23 +953,539 @@ def build_project_summary():
     except Exception as e:
         return jsonify({"error": f"Error while creating the project summary: {e}"}), 500
 
-@app.route('/project-chat', methods=['POST'])
-def project_chat():
-    data = request.json
-    user_message = data.get("message", "").strip()
-    project_dir = data.get("project_dir", "").strip()
-    object_name = data.get("object_name", "").strip()
+CHAT_CONTEXT_TOKEN_BUDGET = max(256, int(os.getenv("GAMMA_CHAT_CONTEXT_TOKENS", "5000")))
+CHAT_CONTEXT_TOP_K = max(1, int(os.getenv("GAMMA_CHAT_TOP_K", "40")))
+CHAT_OUTLINE_BUDGET_SHARE = 0.25
+RETRIEVAL_BM25_K1 = 1.5
+RETRIEVAL_BM25_B = 0.75
+RETRIEVAL_MENTION_BOOST = 6.0
+RETRIEVAL_SELECTED_BOOST = 3.0
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+_retrieval_indexes = OrderedDict()
+_retrieval_indexes_lock = threading.Lock()
+
+def iter_summary_event_blocks(summary_text: str):
+    obj = None
+    event = None
+    lines = []
+
+    for line in (summary_text or "").splitlines(keepends=True):
+        if line.startswith("// === Object: ") or line.startswith("// === End of all objects ==="):
+            if obj and event:
+                yield obj, event, "".join(lines)
+            obj = line[len("// === Object: "):].rstrip().rstrip("=").strip() if "Object:" in line else None
+            event = None
+            lines = []
+        elif obj and line.startswith("// --- Event: "):
+            if event:
+                yield obj, event, "".join(lines)
+            event = line[len("// --- Event: "):].rstrip().rstrip("-").strip()
+            lines = []
+        elif obj and event:
+            lines.append(line)
+
+    if obj and event:
+        yield obj, event, "".join(lines)
+
+TOKEN_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+TOKEN_SINGLE_PATTERN = re.compile(r"\d{1,3}|[^\w\s]{1,2}|\n+|[ \t]{2,}")
+
+_token_encoder = None
+_token_encoder_loaded = False
+_token_encoder_lock = threading.Lock()
+
+def get_token_encoder():
+    global _token_encoder, _token_encoder_loaded
+
+    if tiktoken is None:
+        return None
+
+    with _token_encoder_lock:
+        if not _token_encoder_loaded:
+            _token_encoder_loaded = True
+            try:
+                _token_encoder = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                app.logger.warning("tiktoken encoding could not be loaded, using the heuristic token estimate.")
+        return _token_encoder
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+
+    encoder = get_token_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+
+    words = sum((len(word) + 5) // 6 for word in TOKEN_WORD_PATTERN.findall(text))
+    return words + len(TOKEN_SINGLE_PATTERN.findall(text))
+
+def token_estimator_name() -> str:
+    return "tiktoken" if get_token_encoder() is not None else "heuristic"
+
+def retrieval_terms(text: str) -> list:
+    terms = []
+    for word in IDENTIFIER_PATTERN.findall((text or "").lower()):
+        terms.append(word)
+        if "_" in word:
+            terms.extend(part for part in word.split("_") if len(part) > 1)
+    return terms
+
+def build_retrieval_index(summary_text: str) -> dict:
+    chunks = []
+    postings = {}
+
+    for obj, event, code in iter_summary_event_blocks(summary_text):
+        text = f"// === Object: {obj} ===\n// --- Event: {event} ---\n{code.strip()}\n"
+        terms = Counter(retrieval_terms(f"{obj} {event} {code}"))
+        idx = len(chunks)
+        chunks.append({
+            "object": obj,
+            "event": event,
+            "text": text,
+            "length": sum(terms.values()),
+            "tokens": estimate_tokens(text)
+        })
+        for term, freq in terms.items():
+            postings.setdefault(term, []).append((idx, freq))
 
-    if not user_message:
-        return jsonify({"error": "Please enter a message."}), 400
+    outline = {}
+    for chunk in chunks:
+        outline.setdefault(chunk["object"], []).append(chunk["event"])
 
-    summary_text = read_combined_summary()
-    if not summary_text:
-        return jsonify({
-            "error": "No code summary found yet. Please enter a valid project path first."
-        }), 400
+    return {
+        "chunks": chunks,
+        "postings": postings,
+        "avg_length": (sum(c["length"] for c in chunks) / len(chunks)) if chunks else 0.0,
+        "objects": list(outline),
+        "outline": "".join(f"// {obj}: {', '.join(events)}\n" for obj, events in outline.items())
+    }
+
+def get_retrieval_index(summary_hash: str, summary_text: str) -> dict:
+    with _retrieval_indexes_lock:
+        index = _retrieval_indexes.get(summary_hash)
+        if index is not None:
+            _retrieval_indexes.move_to_end(summary_hash)
+            inc_metric("gamma_cache_requests_total", cache="retrieval", result="hit")
+            return index
+
+    inc_metric("gamma_cache_requests_total", cache="retrieval", result="miss")
+    index = build_retrieval_index(summary_text)
+
+    with _retrieval_indexes_lock:
+        _retrieval_indexes[summary_hash] = index
+        while len(_retrieval_indexes) > SUMMARY_CACHE_SIZE:
+            _retrieval_indexes.popitem(last=False)
+
+    return index
+
+def find_mentioned_objects(question: str, object_names) -> set:
+    words = set(IDENTIFIER_PATTERN.findall((question or "").lower()))
+    return {name for name in object_names if name.lower() in words}
 
-    prompt = f"""
+def score_retrieval_chunks(index: dict, question: str, selected_object: str = "") -> list:
+    chunks = index["chunks"]
+    scores = [0.0] * len(chunks)
+    avg_length = index["avg_length"] or 1.0
+
+    for term in set(retrieval_terms(question)):
+        postings = index["postings"].get(term)
+        if not postings:
+            continue
+
+        idf = math.log(1 + (len(chunks) - len(postings) + 0.5) / (len(postings) + 0.5))
+        for idx, freq in postings:
+            norm = RETRIEVAL_BM25_K1 * (1 - RETRIEVAL_BM25_B + RETRIEVAL_BM25_B * chunks[idx]["length"] / avg_length)
+            scores[idx] += idf * freq * (RETRIEVAL_BM25_K1 + 1) / (freq + norm)
+
+    mentioned = find_mentioned_objects(question, index["objects"])
+    for idx, chunk in enumerate(chunks):
+        if chunk["object"] in mentioned:
+            scores[idx] += RETRIEVAL_MENTION_BOOST
+        if selected_object and chunk["object"] == selected_object:
+            scores[idx] += RETRIEVAL_SELECTED_BOOST
+
+    return scores
+
+@timed_stage("chat_retrieval")
+def select_chat_context(summary_text: str, summary_hash: str, question: str, selected_object: str = "", token_budget: int = None, top_k=CHAT_CONTEXT_TOP_K) -> dict:
+    budget = CHAT_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    index = get_retrieval_index(summary_hash, summary_text)
+    chunks = index["chunks"]
+
+    outline = index["outline"]
+    used = estimate_tokens(outline)
+    if used > budget * CHAT_OUTLINE_BUDGET_SHARE:
+        outline = ""
+        used = 0
+
+    scores = score_retrieval_chunks(index, question, selected_object)
+    ranked = sorted(range(len(chunks)), key=lambda idx: (-scores[idx], idx))
+
+    chosen = []
+    for idx in ranked:
+        if top_k is not None and len(chosen) >= top_k:
+            break
+        if used + chunks[idx]["tokens"] > budget:
+            continue
+        chosen.append(idx)
+        used += chunks[idx]["tokens"]
+
+    parts = []
+    if outline:
+        parts.append("// Objects and events of the project:\n" + outline + "\n")
+
+    last_object = None
+    for idx in sorted(chosen):
+        chunk = chunks[idx]
+        if chunk["object"] == last_object:
+            parts.append(chunk["text"].split("\n", 1)[1])
+        else:
+            parts.append(chunk["text"])
+        last_object = chunk["object"]
+
+    return {
+        "text": "\n".join(parts),
+        "chunks": len(chosen),
+        "total_chunks": len(chunks),
+        "estimated_tokens": used
+    }
+
+def prompt_section(name: str, text: str, priority: int, required: bool = False, shrink=None) -> dict:
+    return {
+        "name": name,
+        "text": text,
+        "priority": priority,
+        "required": required,
+        "shrink": shrink
+    }
+
+def choose_num_ctx(prompt_tokens: int) -> int:
+    wanted = prompt_tokens + RESPONSE_TOKEN_RESERVE
+    rounded = ((wanted + 1023) // 1024) * 1024
+    return max(OLLAMA_NUM_CTX_MIN, min(OLLAMA_NUM_CTX_MAX, rounded))
+
+def assemble_prompt(sections: list, token_budget: int = None) -> dict:
+    budget = token_budget or PROMPT_TOKEN_BUDGET
+    texts = {section["name"]: section["text"] for section in sections}
+    tokens = {name: estimate_tokens(text) for name, text in texts.items()}
+    total = sum(tokens.values())
+    compressed = []
+    dropped = []
+
+    for section in sorted(sections, key=lambda item: item["priority"]):
+        if total <= budget:
+            break
+
+        name = section["name"]
+        if section["shrink"] and tokens[name]:
+            target = max(0, tokens[name] - (total - budget))
+            shrunk = section["shrink"](target) if target else ""
+            shrunk_tokens = estimate_tokens(shrunk)
+            if shrunk_tokens < tokens[name]:
+                total -= tokens[name] - shrunk_tokens
+                texts[name] = shrunk
+                tokens[name] = shrunk_tokens
+                compressed.append(name)
+
+        if total > budget and not section["required"] and tokens[name]:
+            total -= tokens[name]
+            texts[name] = ""
+            tokens[name] = 0
+            dropped.append(name)
+
+    prompt = "".join(texts[section["name"]] for section in sections).strip()
+    prompt_tokens = estimate_tokens(prompt)
+
+    return {
+        "prompt": prompt,
+        "num_ctx": choose_num_ctx(prompt_tokens),
+        "budget": {
+            "limit": budget,
+            "prompt_tokens": prompt_tokens,
+            "num_ctx": choose_num_ctx(prompt_tokens),
+            "response_reserve": RESPONSE_TOKEN_RESERVE,
+            "sections": tokens,
+            "compressed": compressed,
+            "dropped": dropped,
+            "over_budget": prompt_tokens > budget,
+            "estimator": token_estimator_name()
+        }
+    }
+
+CONDENSED_SUMMARY_MODE = os.getenv("GAMMA_CONDENSED_SUMMARIES", "0").strip().lower()
+CONDENSED_SUMMARY_VERSION = 1
+CONDENSE_WORKERS = max(1, int(os.getenv("GAMMA_CONDENSE_WORKERS", "4")))
+CONDENSE_INPUT_TOKENS = max(256, int(os.getenv("GAMMA_CONDENSE_INPUT_TOKENS", "3000")))
+CONDENSED_CONTEXT_TOKENS = max(128, int(os.getenv("GAMMA_CONDENSED_CONTEXT_TOKENS", "2000")))
+_condense_pool = ThreadPoolExecutor(max_workers=CONDENSE_WORKERS, thread_name_prefix="gamma-condense")
+_condensed_summaries = OrderedDict()
+_condense_runs = {}
+_condense_lock = threading.Lock()
+
+def condensed_summary_path(project_dir: str) -> str:
+    return os.path.join(SUMMARY_STORE_DIR, f"{project_store_key(project_dir)}.condensed.json")
+
+def split_summary_objects(summary_text: str) -> OrderedDict:
+    text = summary_text or ""
+    headers = list(SUMMARY_OBJECT_PATTERN.finditer(text))
+    end_marker = text.find("// === End of all objects ===")
+    fragments = OrderedDict()
+
+    for i, match in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else (end_marker if end_marker != -1 else len(text))
+        fragments[match.group(1).strip()] = text[match.start():end]
+
+    return fragments
+
+def summary_objects_hash(summary_text: str) -> str:
+    # Leaves out the banner with the project path and build time, so copies of a project share a hash.
+    fragments = split_summary_objects(summary_text)
+    return hashlib.sha1("".join(fragments.values()).encode("utf-8")).hexdigest()
+
+def fragment_hash(fragment: str) -> str:
+    return hashlib.sha1(fragment.encode("utf-8")).hexdigest()
+
+def overview_hash(object_hashes: dict) -> str:
+    raw = "|".join(f"{obj}:{object_hashes[obj]}" for obj in sorted(object_hashes))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def clip_to_tokens(text: str, tokens: int) -> str:
+    total = estimate_tokens(text)
+    if total <= tokens:
+        return text
+    return text[:max(0, int(len(text) * tokens / total))]
+
+def condense_text(kind: str, name: str, text: str, project_dir: str = "") -> str:
+    assembled = assemble_prompt([
+        prompt_section("instructions", f"""
+    You condense parts of a GameMaker project so that a later prompt can work with the whole project at once.
+
+    Summarize the {kind} "{name}" below in at most 6 short plain-text lines.
+    - Name the events and what they do.
+    - Name every other object, room or script it creates, destroys, checks or changes.
+    - Mention important variables and their starting values.
+    - No Markdown, no code blocks, no introduction.
+
+""", priority=100, required=True),
+        prompt_section("content", clip_to_tokens(text, CONDENSE_INPUT_TOKENS), priority=10)
+    ])
+    return call_ollama_cloud(
+        assembled["prompt"],
+        num_ctx=assembled["num_ctx"],
+        project_dir=project_dir,
+        priority=MODEL_PRIORITY_BACKGROUND
+    ).strip()
+
+def condense_object(obj: str, fragment: str, project_dir: str = "") -> str:
+    code = prepare_prompt_code(fragment)
+    if estimate_tokens(code) <= CONDENSE_INPUT_TOKENS:
+        return condense_text("object", obj, code, project_dir)
+
+    event_notes = []
+    for _, event, block in iter_summary_event_blocks(fragment + "// === End of all objects ===\n"):
+        # Keep the headers so the block is compressed like a whole object.
+        code = prepare_prompt_code(f"// === Object: {obj} ===\n// --- Event: {event} ---\n{block}")
+        event_notes.append(f"Event {event}: {condense_text('event', f'{obj} / {event}', code, project_dir)}")
+    return condense_text("object", obj, "\n".join(event_notes), project_dir)
+
+def reduce_object_notes(notes: dict, project_dir: str = "") -> str:
+    lines = [f"{obj}: {' '.join(note.split())}" for obj, note in sorted(notes.items())]
+
+    while True:
+        text = "\n".join(lines)
+        if estimate_tokens(text) <= CONDENSE_INPUT_TOKENS:
+            return condense_text("project", "overview", text, project_dir)
+
+        groups, current, used = [], [], 0
+        for line in lines:
+            tokens = estimate_tokens(line) + 1
+            if current and used + tokens > CONDENSE_INPUT_TOKENS:
+                groups.append(current)
+                current, used = [], 0
+            current.append(line)
+            used += tokens
+        groups.append(current)
+
+        lines = list(_condense_pool.map(
+            lambda group: condense_text("group of objects", f"{group[0].split(':')[0]} ...", "\n".join(group), project_dir),
+            groups
+        ))
+
+def load_condensed_summaries(project_dir: str) -> dict:
+    key = project_store_key(project_dir)
+    stamp = file_stamp(condensed_summary_path(project_dir))
+    with _condense_lock:
+        cached = _condensed_summaries.get(key)
+        if cached is not None and cached[0] == stamp:
+            _condensed_summaries.move_to_end(key)
+            return cached[1]
+
+    data = {"version": CONDENSED_SUMMARY_VERSION, "model": OLLAMA_CLOUD_MODEL, "objects": {}, "overview": {}}
+    try:
+        with open(condensed_summary_path(project_dir), "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("version") == CONDENSED_SUMMARY_VERSION and stored.get("model") == OLLAMA_CLOUD_MODEL:
+            data = stored
+    except (OSError, ValueError):
+        pass
+
+    cache_condensed_summaries(key, stamp, data)
+    return data
+
+def cache_condensed_summaries(key: str, stamp, data: dict):
+    with _condense_lock:
+        _condensed_summaries[key] = (stamp, data)
+        _condensed_summaries.move_to_end(key)
+        while len(_condensed_summaries) > SUMMARY_CACHE_SIZE:
+            _condensed_summaries.popitem(last=False)
+
+def update_condensed_summaries(project_dir: str, summary_text: str) -> dict:
+    with project_store_lock(project_dir, "condense"):
+        return _update_condensed_summaries(project_dir, summary_text)
+
+def _update_condensed_summaries(project_dir: str, summary_text: str) -> dict:
+    stored = load_condensed_summaries(project_dir)
+    fragments = split_summary_objects(summary_text)
+    hashes = {obj: fragment_hash(fragment) for obj, fragment in fragments.items()}
+
+    objects = {
+        obj: stored["objects"][obj]
+        for obj in fragments
+        if obj in stored["objects"] and stored["objects"][obj]["hash"] == hashes[obj]
+    }
+    pending = [obj for obj in fragments if obj not in objects]
+
+    def condense(obj):
+        try:
+            return obj, condense_object(obj, fragments[obj], project_dir)
+        except Exception as e:
+            app.logger.warning("Condensing %s failed: %s", obj, e)
+            return obj, ""
+
+    for obj, text in _condense_pool.map(condense, pending):
+        if text:
+            objects[obj] = {"hash": hashes[obj], "text": text}
+
+    overview = stored.get("overview") or {}
+    if len(objects) == len(fragments) and overview.get("hash") != overview_hash(hashes):
+        try:
+            text = reduce_object_notes({obj: entry["text"] for obj, entry in objects.items()}, project_dir)
+            overview = {"hash": overview_hash(hashes), "text": text}
+        except Exception as e:
+            app.logger.warning("Condensing the project overview failed: %s", e)
+
+    data = {"version": CONDENSED_SUMMARY_VERSION, "model": OLLAMA_CLOUD_MODEL, "objects": objects, "overview": overview}
+    path = condensed_summary_path(project_dir)
+    os.makedirs(SUMMARY_STORE_DIR, exist_ok=True)
+    write_file_atomic(path, json.dumps(data))
+
+    cache_condensed_summaries(project_store_key(project_dir), file_stamp(path), data)
+    return data
+
+def run_condensed_summaries(project_dir: str):
+    key = project_store_key(project_dir)
+    try:
+        while True:
+            entry = get_summary_entry(project_dir)
+            if entry:
+                update_condensed_summaries(project_dir, entry["text"])
+            with _condense_lock:
+                if not _condense_runs.get(key):
+                    del _condense_runs[key]
+                    return
+                _condense_runs[key] = False
+    except Exception:
+        with _condense_lock:
+            _condense_runs.pop(key, None)
+        raise
+
+def schedule_condensed_summaries(project_dir: str):
+    if CONDENSED_SUMMARY_MODE in ("0", "false", "no", "off"):
+        return
+
+    entry = get_summary_entry(project_dir)
+    if not entry:
+        return
+    if CONDENSED_SUMMARY_MODE == "auto" and estimate_tokens(entry["text"]) <= PROMPT_TOKEN_BUDGET:
+        return
+
+    key = project_store_key(project_dir)
+    with _condense_lock:
+        if key in _condense_runs:
+            _condense_runs[key] = True
+            return
+        _condense_runs[key] = False
+
+    threading.Thread(target=run_condensed_summaries, args=(project_dir,), daemon=True).start()
+
+def get_condensed_summary(project_dir: str, summary_text: str):
+    if CONDENSED_SUMMARY_MODE in ("0", "false", "no", "off"):
+        return None
+
+    stored = load_condensed_summaries(project_dir)
+    if not stored["objects"]:
+        return None
+
+    hashes = {obj: fragment_hash(fragment) for obj, fragment in split_summary_objects(summary_text).items()}
+    objects = {
+        obj: stored["objects"][obj]["text"]
+        for obj in hashes
+        if obj in stored["objects"] and stored["objects"][obj]["hash"] == hashes[obj]
+    }
+    overview = stored.get("overview") or {}
+
+    return {
+        "overview": overview.get("text", "") if overview.get("hash") == overview_hash(hashes) else "",
+        "objects": objects,
+        "missing": [obj for obj in hashes if obj not in objects]
+    }
+
+def render_condensed_context(condensed: dict, token_budget: int, focus=()) -> str:
+    parts = []
+    used = 0
+
+    if condensed["overview"]:
+        overview = f"// Project overview:\n{condensed['overview']}\n\n"
+        used = estimate_tokens(overview)
+        if used <= token_budget:
+            parts.append(overview)
+        else:
+            used = 0
+
+    order = [obj for obj in focus if obj in condensed["objects"]]
+    order += [obj for obj in sorted(condensed["objects"]) if obj not in order]
+
+    notes = []
+    for obj in order:
+        line = f"// {obj}: {' '.join(condensed['objects'][obj].split())}\n"
+        tokens = estimate_tokens(line)
+        if used + tokens > token_budget:
+            continue
+        notes.append(line)
+        used += tokens
+
+    if notes:
+        parts.append("// Notes per object:\n" + "".join(notes))
+    return "".join(parts)
+
+@timed_stage("chat_prompt")
+def build_project_chat_prompt(project_dir: str, object_name: str, summary_entry: dict, user_message: str) -> dict:
+    context = select_chat_context(summary_entry["text"], summary_entry["hash"], user_message, object_name)
+
+    def shrink_context(tokens):
+        return prepare_prompt_code(select_chat_context(
+            summary_entry["text"], summary_entry["hash"], user_message, object_name, token_budget=tokens
+        )["text"])
+
+    condensed = get_condensed_summary(project_dir, summary_entry["text"])
+    focus = [object_name] if object_name else []
+    if condensed:
+        focus += sorted(find_mentioned_objects(user_message, condensed["objects"]))
+
+    sections = [
+        prompt_section("instructions", f"""
     You are an assistant for adapting and improving a GameMaker project.
 
     Project directory:
@@ -247,13 +1494,19 @@ def project_chat():
     Currently selected object:
     {object_name}
 
-    Below is a combined code summary of all object code in the project:
-
-    {summary_text}
-
+    Below is an outline of all objects and the parts of the object code that are most relevant to the question:
+""", priority=90, required=True),
+        prompt_section("project_overview", render_condensed_context(
+            condensed, CONDENSED_CONTEXT_TOKENS, focus
+        ) if condensed else "", priority=20, shrink=lambda tokens: render_condensed_context(condensed, tokens, focus)),
+        prompt_section("project_summary", f"""
+    {prepare_prompt_code(context["text"])}
+""", priority=10, shrink=shrink_context),
+        prompt_section("user_question", f"""
     User question:
     {user_message}
-
+""", priority=100, required=True),
+        prompt_section("rules", """
     Please follow these rules:
     1. Answer in German.
     2. Be practical and concise.
@@ -273,13 +1526,221 @@ def project_chat():
     - Analyze the existing object/event structure.
     - Suggest concrete improvements.
     - Provide nachvollziehbare vorher/nachher changes where useful.
-    """
+    """, priority=80, required=True)
+    ]
+
+    assembled = assemble_prompt(sections)
+    assembled["budget"]["context_chunks"] = context["chunks"]
+    assembled["budget"]["total_chunks"] = context["total_chunks"]
+    return assembled
+
+CHAT_CACHE_SIZE = max(0, int(os.getenv("GAMMA_CHAT_CACHE_SIZE", "256")))
+CHAT_CACHE_TTL_SEC = float(os.getenv("GAMMA_CHAT_CACHE_TTL_SEC", "3600"))
+CHAT_CACHE_SIMILARITY = float(os.getenv("GAMMA_CHAT_CACHE_SIMILARITY", "0"))
+CHAT_QUESTION_NOISE_PATTERN = re.compile(r"[^\w\s]+")
+_chat_cache = OrderedDict()
+_chat_cache_lock = threading.Lock()
+
+def normalize_chat_question(question: str) -> str:
+    return " ".join(CHAT_QUESTION_NOISE_PATTERN.sub(" ", (question or "").lower()).split())
+
+def question_fingerprint(normalized: str) -> frozenset:
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(max(1, len(padded) - 2)))
+
+def chat_cache_scope(summary_hash: str, object_name: str) -> tuple:
+    return (summary_hash, object_name or "", OLLAMA_CLOUD_MODEL)
+
+def lookup_chat_cache(summary_hash: str, object_name: str, question: str):
+    if CHAT_CACHE_SIZE == 0:
+        return None
+
+    hit = find_chat_cache_entry(summary_hash, object_name, question)
+    inc_metric("gamma_cache_requests_total", cache="chat", result=hit["tier"] if hit else "miss")
+    return hit
+
+def find_chat_cache_entry(summary_hash: str, object_name: str, question: str):
+    scope = chat_cache_scope(summary_hash, object_name)
+    normalized = normalize_chat_question(question)
+    now = time.time()
+
+    with _chat_cache_lock:
+        for key in [key for key, entry in _chat_cache.items() if now - entry["created_at"] > CHAT_CACHE_TTL_SEC]:
+            del _chat_cache[key]
+
+        entry = _chat_cache.get(scope + (normalized,))
+        if entry is not None:
+            _chat_cache.move_to_end(scope + (normalized,))
+            return {"answer": entry["answer"], "tier": "exact", "similarity": 1.0, "age_sec": round(now - entry["created_at"], 1)}
+
+        if CHAT_CACHE_SIMILARITY <= 0:
+            return None
+
+        fingerprint = question_fingerprint(normalized)
+        best_key, best_score = None, 0.0
+        for key, entry in _chat_cache.items():
+            if key[:3] != scope:
+                continue
+            score = len(fingerprint & entry["fingerprint"]) / (len(fingerprint | entry["fingerprint"]) or 1)
+            if score > best_score:
+                best_key, best_score = key, score
+
+        if best_key is None or best_score < CHAT_CACHE_SIMILARITY:
+            return None
+
+        entry = _chat_cache[best_key]
+        _chat_cache.move_to_end(best_key)
+        return {"answer": entry["answer"], "tier": "similar", "similarity": round(best_score, 3), "age_sec": round(now - entry["created_at"], 1)}
+
+def store_chat_cache(summary_hash: str, object_name: str, question: str, answer: str):
+    if CHAT_CACHE_SIZE == 0 or not answer:
+        return
+
+    normalized = normalize_chat_question(question)
+    key = chat_cache_scope(summary_hash, object_name) + (normalized,)
+
+    with _chat_cache_lock:
+        _chat_cache[key] = {
+            "answer": answer,
+            "fingerprint": question_fingerprint(normalized),
+            "created_at": time.time()
+        }
+        _chat_cache.move_to_end(key)
+        while len(_chat_cache) > CHAT_CACHE_SIZE:
+            _chat_cache.popitem(last=False)
+
+def chat_cache_meta(hit: dict = None) -> dict:
+    if not hit:
+        return {"hit": False}
+    return {"hit": True, "tier": hit["tier"], "similarity": hit["similarity"], "age_sec": hit["age_sec"]}
+
+def prepare_project_chat(data: dict) -> tuple:
+    user_message = (data.get("message") or "").strip()
+    project_dir = (data.get("project_dir") or "").strip()
+    object_name = (data.get("object_name") or "").strip()
+
+    if not user_message:
+        return None, "Please enter a message."
 
+    summary_entry = get_summary_entry(project_dir)
+    if not summary_entry or not summary_entry["text"]:
+        return None, "No code summary found yet. Please enter a valid project path first."
+
+    return {
+        "user_message": user_message,
+        "project_dir": project_dir,
+        "object_name": object_name,
+        "summary_entry": summary_entry,
+        "request_id": (data.get("request_id") or "").strip(),
+        "cached": lookup_chat_cache(summary_entry["content_hash"], object_name, user_message)
+    }, None
+
+@app.route('/project-chat', methods=['POST'])
+def project_chat():
+    chat, error = prepare_project_chat(request.json or {})
+    if error:
+        return jsonify({"error": error}), 400
+
+    if chat["cached"]:
+        return jsonify({"answer": chat["cached"]["answer"], "meta": {"cache": chat_cache_meta(chat["cached"])}})
+
+    summary_entry = chat["summary_entry"]
+    assembled = build_project_chat_prompt(chat["project_dir"], chat["object_name"], summary_entry, chat["user_message"])
+
+    handle = open_model_request(chat["request_id"])
     try:
-        answer = call_ollama_cloud(prompt)
-        return jsonify({"answer": answer})
+        answer = call_ollama_cloud(
+            assembled["prompt"],
+            num_ctx=assembled["num_ctx"],
+            project_dir=chat["project_dir"],
+            is_cancelled=lambda: model_request_cancelled(handle),
+            request=handle
+        )
+        store_chat_cache(summary_entry["content_hash"], chat["object_name"], chat["user_message"], answer)
+        return jsonify({"answer": answer, "meta": {"budget": assembled["budget"], "cache": chat_cache_meta()}})
     except Exception as e:
         return jsonify({"error": f"Ollama-Cloud-Error: {e}"}), 500
+    finally:
+        close_model_request(handle)
+
+SSE_KEEPALIVE_SEC = float(os.getenv("GAMMA_SSE_KEEPALIVE_SEC", "5"))
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def format_sse(data: dict, event: str = "") -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def cached_chat_events(cached: dict) -> list:
+    return [
+        format_sse({"cache": chat_cache_meta(cached)}, event="meta"),
+        format_sse({"token": cached["answer"]}),
+        format_sse({}, event="done")
+    ]
+
+@app.route('/project-chat-stream', methods=['POST'])
+def project_chat_stream():
+    chat, error = prepare_project_chat(request.json or {})
+    if error:
+        return jsonify({"error": error}), 400
+
+    if chat["cached"]:
+        return Response(cached_chat_events(chat["cached"]), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+    project_dir = chat["project_dir"]
+    summary_entry = chat["summary_entry"]
+    assembled = build_project_chat_prompt(project_dir, chat["object_name"], summary_entry, chat["user_message"])
+
+    def generate():
+        yield format_sse({"budget": assembled["budget"], "cache": chat_cache_meta()}, event="meta")
+        handle = open_model_request(chat["request_id"])
+        ticket = enqueue_model_call(project_dir, MODEL_PRIORITY_INTERACTIVE)
+        stream = None
+        try:
+            deadline = time.perf_counter() + OLLAMA_QUEUE_TIMEOUT_SEC
+            keepalive_at = time.perf_counter() + SSE_KEEPALIVE_SEC
+            while not wait_for_model_slot(ticket, min(SSE_KEEPALIVE_SEC, MODEL_CANCEL_POLL_SEC)):
+                if model_request_cancelled(handle):
+                    raise RuntimeError("Model call was cancelled while queued.")
+                if time.perf_counter() >= deadline:
+                    raise TimeoutError(f"No model slot became free within {OLLAMA_QUEUE_TIMEOUT_SEC:g}s.")
+                if time.perf_counter() >= keepalive_at:
+                    keepalive_at = time.perf_counter() + SSE_KEEPALIVE_SEC
+                    yield ": queued\n\n"
+
+            stream = stream_ollama_cloud(
+                assembled["prompt"],
+                num_ctx=assembled["num_ctx"],
+                ticket=ticket,
+                is_cancelled=lambda: model_request_cancelled(handle),
+                request=handle
+            )
+            parts = []
+            keepalive_at = time.perf_counter() + SSE_KEEPALIVE_SEC
+            for token in clean_model_stream(stream):
+                if token:
+                    parts.append(token)
+                    keepalive_at = time.perf_counter() + SSE_KEEPALIVE_SEC
+                    yield format_sse({"token": token})
+                elif time.perf_counter() >= keepalive_at:
+                    # Writing is the only way a WSGI server notices a dropped connection.
+                    keepalive_at = time.perf_counter() + SSE_KEEPALIVE_SEC
+                    yield ": generating\n\n"
+            store_chat_cache(summary_entry["content_hash"], chat["object_name"], chat["user_message"], "".join(parts).strip())
+            yield format_sse({}, event="done")
+        except GeneratorExit:
+            # The client went away; closing the stream below drops the upstream connection.
+            trigger_model_request_cancel(handle)
+            raise
+        except Exception as e:
+            yield format_sse({"error": f"Ollama-Cloud-Error: {e}"}, event="error")
+        finally:
+            if stream is not None:
+                stream.close()
+            cancel_model_call(ticket)
+            release_model_slot(ticket)
+            close_model_request(handle)
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=SSE_HEADERS)
 
 @app.route('/event-content', methods=['POST'])
 def event_content():
@@ -324,15 +1785,21 @@ def save_event():
         return jsonify({"error": f"Event file not found: {file_path}"}), 404
 
     try:
+        previous_hash = summary_content_hash(project_dir)
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(content)
 
         summary_file = build_all_objects_summary(project_dir)
+        schedule_condensed_summaries(project_dir)
+        graph_patch = update_project_graph_for_event(
+            project_dir, object_name, event_from_filename(filename), previous_hash
+        )
 
         return jsonify({
             "status": "Event file successfully saved",
             "path": file_path,
-            "summary_file": summary_file
+            "summary_file": summary_file,
+            "graph_patch": graph_patch
         })
     except Exception as e:
         return jsonify({"error": f"Error while saving the event file: {e}"}), 500
@@ -347,37 +1814,747 @@ def clean_model_response(text: str) -> str:
 
     return text
 
-def call_ollama_cloud(prompt: str) -> str:
+THINK_OPEN_TAG = "<think>"
+THINK_CLOSE_TAG = "</think>"
+
+def partial_tag_suffix_length(text: str, tag: str) -> int:
+    lowered = text[-(len(tag) - 1):].lower()
+    for size in range(min(len(lowered), len(tag) - 1), 0, -1):
+        if tag.startswith(lowered[-size:]):
+            return size
+    return 0
+
+def make_stream_cleaner():
+    pending = ""
+    held = ""
+    inside_think = False
+    emitted = False
+
+    def visible_parts():
+        nonlocal pending, inside_think
+        parts = []
+        while pending:
+            tag = THINK_CLOSE_TAG if inside_think else THINK_OPEN_TAG
+            idx = pending.lower().find(tag)
+            if idx == -1:
+                keep = partial_tag_suffix_length(pending, tag)
+                if not inside_think:
+                    parts.append(pending[:len(pending) - keep])
+                pending = pending[len(pending) - keep:]
+                break
+            if not inside_think:
+                parts.append(pending[:idx])
+            pending = pending[idx + len(tag):]
+            inside_think = not inside_think
+        return "".join(parts)
+
+    def release(text):
+        nonlocal held, emitted
+        combined = held + text
+        body = combined.rstrip()
+        held = combined[len(body):]
+        if not emitted:
+            body = body.lstrip()
+        if not body:
+            return ""
+        emitted = True
+        return re.sub(r"\n{3,}", "\n\n", body)
+
+    def feed(chunk):
+        nonlocal pending
+        pending += chunk
+        return release(visible_parts())
+
+    def finish():
+        if not inside_think and pending:
+            return release(pending)
+        return ""
+
+    return feed, finish
+
+def clean_model_stream(chunks):
+    feed, finish = make_stream_cleaner()
+
+    for chunk in chunks:
+        yield feed(chunk)
+
+    text = finish()
+    if text:
+        yield text
+
+def ollama_request_headers() -> dict:
     if not OLLAMA_CLOUD_API_KEY:
         raise RuntimeError("OLLAMA_CLOUD_API_KEY was not found in the .env file.")
 
-    headers = {
+    return {
         "Authorization": f"Bearer {OLLAMA_CLOUD_API_KEY}"
     }
 
-    url = f"{OLLAMA_CLOUD_BASE_URL}/api/generate"
-    payload = {
+def build_ollama_payload(prompt: str, stream: bool = False, num_ctx: int = None) -> dict:
+    return {
         "model": OLLAMA_CLOUD_MODEL,
         "prompt": prompt,
-        "stream": False,
+        "stream": stream,
         "options": {
             "temperature": 0.5,
-            "num_ctx": 8192
+            "num_ctx": num_ctx or OLLAMA_NUM_CTX_MAX
         }
     }
 
-    resp = requests.post(
-        url,
-        json=payload,
-        headers=headers,
-        timeout=(10, OLLAMA_TIMEOUT_SEC)
-    )
+_ollama_session = None
+_ollama_session_lock = threading.Lock()
+_ollama_call_timings = deque(maxlen=200)
+MODEL_QUEUE_RECENT_CALLS = 20
+_model_queue_cond = threading.Condition()
+_model_queue = []
+_model_active_calls = 0
+_model_call_seq = 0
+_model_project_turns = {}
+_model_queue_waits = deque(maxlen=500)
+_model_queue_counters = Counter()
+_inflight_calls = {}
+_inflight_calls_lock = threading.Lock()
+
+def get_ollama_session() -> requests.Session:
+    global _ollama_session
+
+    with _ollama_session_lock:
+        if _ollama_session is None:
+            retry = Retry(
+                total=OLLAMA_MAX_RETRIES,
+                connect=OLLAMA_MAX_RETRIES,
+                read=0,
+                status=OLLAMA_MAX_RETRIES,
+                backoff_factor=OLLAMA_RETRY_BACKOFF_SEC,
+                status_forcelist=OLLAMA_RETRY_STATUSES,
+                allowed_methods=frozenset(["POST"]),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=OLLAMA_POOL_SIZE,
+                max_retries=retry
+            )
+
+            session = requests.Session()
+            session.headers.update({"Connection": "keep-alive"})
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _ollama_session = session
+
+        return _ollama_session
+
+def record_ollama_timing(kind: str, status: int, started: float, headers_sec: float, first_token_sec=None):
+    total_sec = time.perf_counter() - started
+    timing = {
+        "kind": kind,
+        "status": status,
+        "headers_sec": round(headers_sec, 4),
+        "read_sec": round(max(0.0, total_sec - headers_sec), 4),
+        "total_sec": round(total_sec, 4)
+    }
+    if first_token_sec is not None:
+        timing["first_token_sec"] = round(first_token_sec, 4)
+
+    _ollama_call_timings.append(timing)
+    observe_metric("gamma_model_request_duration_seconds", total_sec, kind=kind)
+    inc_metric("gamma_model_requests_total", kind=kind, status=status)
+    app.logger.debug("Ollama call timing: %s", timing)
+    return timing
+
+def record_model_tokens(data: dict):
+    inc_metric("gamma_model_tokens_total", data.get("prompt_eval_count") or 0, direction="prompt")
+    inc_metric("gamma_model_tokens_total", data.get("eval_count") or 0, direction="completion")
+
+def get_ollama_call_timings() -> list:
+    return list(_ollama_call_timings)
+
+def enqueue_model_call(project_dir: str = "", priority: int = MODEL_PRIORITY_INTERACTIVE, on_granted=None) -> dict:
+    global _model_call_seq
+
+    with _model_queue_cond:
+        _model_call_seq += 1
+        ticket = {
+            "seq": _model_call_seq,
+            "project": project_store_key(project_dir) if project_dir else "",
+            "priority": priority,
+            "enqueued_at": time.perf_counter(),
+            "state": "queued",
+            "on_granted": on_granted
+        }
+        _model_queue.append(ticket)
+        _model_queue_counters["enqueued"] += 1
+        dispatch_model_calls()
+
+    return ticket
+
+def dispatch_model_calls():
+    global _model_active_calls
+
+    granted = False
+    while _model_queue and _model_active_calls < OLLAMA_MAX_CONCURRENT_CALLS:
+        ticket = min(
+            _model_queue,
+            key=lambda t: (t["priority"], _model_project_turns.get(t["project"], 0), t["seq"])
+        )
+        _model_queue.remove(ticket)
+        _model_active_calls += 1
+        _model_queue_counters["granted"] += 1
+        _model_project_turns[ticket["project"]] = _model_queue_counters["granted"]
+        _model_queue_waits.append(time.perf_counter() - ticket["enqueued_at"])
+        ticket["state"] = "running"
+        granted = True
+        if ticket["on_granted"] is not None:
+            ticket["on_granted"]()
+
+    if granted:
+        _model_queue_cond.notify_all()
+
+def wait_for_model_slot(ticket: dict, timeout: float) -> bool:
+    with _model_queue_cond:
+        _model_queue_cond.wait_for(lambda: ticket["state"] != "queued", timeout)
+        if ticket["state"] == "cancelled":
+            raise RuntimeError("Model call was cancelled while queued.")
+        return ticket["state"] == "running"
+
+def cancel_model_call(ticket: dict) -> bool:
+    with _model_queue_cond:
+        if ticket["state"] != "queued":
+            return False
+        _model_queue.remove(ticket)
+        ticket["state"] = "cancelled"
+        _model_queue_counters["cancelled"] += 1
+        _model_queue_cond.notify_all()
+        return True
+
+def release_model_slot(ticket: dict):
+    global _model_active_calls
+
+    with _model_queue_cond:
+        if ticket["state"] != "running":
+            return
+        ticket["state"] = "done"
+        _model_active_calls -= 1
+        dispatch_model_calls()
+
+def acquire_model_slot(project_dir: str = "", priority: int = MODEL_PRIORITY_INTERACTIVE, is_cancelled=None) -> dict:
+    if is_cancelled is not None and is_cancelled():
+        raise RuntimeError("Model call was cancelled before it was queued.")
+
+    ticket = enqueue_model_call(project_dir, priority)
+    deadline = time.perf_counter() + OLLAMA_QUEUE_TIMEOUT_SEC
+
+    while not wait_for_model_slot(ticket, 0.25):
+        if is_cancelled is not None and is_cancelled() and cancel_model_call(ticket):
+            raise RuntimeError("Model call was cancelled while queued.")
+        if time.perf_counter() >= deadline and cancel_model_call(ticket):
+            with _model_queue_cond:
+                _model_queue_counters["timed_out"] += 1
+            raise TimeoutError(f"No model slot became free within {OLLAMA_QUEUE_TIMEOUT_SEC:g}s.")
+
+    return ticket
+
+def get_model_queue_stats() -> dict:
+    with _model_queue_cond:
+        queued = Counter("interactive" if t["priority"] <= MODEL_PRIORITY_INTERACTIVE else "background" for t in _model_queue)
+        waits = sorted(_model_queue_waits)
+        stats = {
+            "max_concurrent": OLLAMA_MAX_CONCURRENT_CALLS,
+            "active": _model_active_calls,
+            "queued": len(_model_queue),
+            "queued_by_priority": dict(queued),
+            "in_flight": len(_inflight_calls),
+            "counters": dict(_model_queue_counters)
+        }
+
+    stats["recent_calls"] = get_ollama_call_timings()[-MODEL_QUEUE_RECENT_CALLS:]
+    stats["wait_sec"] = {
+        "samples": len(waits),
+        "avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+        "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+        "max": round(waits[-1], 4) if waits else 0.0
+    }
+    return stats
+
+@app.route('/model-queue', methods=['GET'])
+def model_queue():
+    return jsonify(get_model_queue_stats())
+
+MODEL_CANCEL_DIR = os.path.join(SUMMARY_STORE_DIR, "cancelled")
+MODEL_CANCEL_POLL_SEC = 0.5
+MODEL_CANCEL_MARKER_TTL_SEC = 600
+MODEL_CANCEL_MARKER_LIMIT = 1000
+MODEL_CANCEL_SHARED = os.getenv("GAMMA_SHARED_CANCEL", "0").strip().lower() in ("1", "true", "yes")
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+_model_requests = {}
+_model_requests_lock = threading.Lock()
+
+def model_cancel_path(request_id: str) -> str:
+    return os.path.join(MODEL_CANCEL_DIR, request_id)
+
+def open_model_request(request_id: str = "") -> dict:
+    handle = {
+        "id": request_id if REQUEST_ID_PATTERN.fullmatch(request_id or "") else "",
+        "cancelled": threading.Event(),
+        "closers": [],
+        "checked_at": 0.0
+    }
+    if handle["id"]:
+        with _model_requests_lock:
+            _model_requests[handle["id"]] = handle
+    return handle
+
+def close_model_request(handle: dict):
+    if not handle["id"]:
+        return
+
+    with _model_requests_lock:
+        if _model_requests.get(handle["id"]) is handle:
+            del _model_requests[handle["id"]]
+
+    if handle["cancelled"].is_set():
+        try:
+            os.remove(model_cancel_path(handle["id"]))
+        except OSError:
+            pass
+
+def trigger_model_request_cancel(handle: dict):
+    with _model_requests_lock:
+        if handle["cancelled"].is_set():
+            return
+        handle["cancelled"].set()
+        closers = list(handle["closers"])
+
+    with _model_queue_cond:
+        _model_queue_counters["requests_cancelled"] += 1
+    for closer in closers:
+        closer()
+
+def model_request_cancelled(handle: dict) -> bool:
+    if handle["cancelled"].is_set():
+        return True
+
+    # Cancels that reached another worker process leave a marker file behind.
+    now = time.monotonic()
+    if MODEL_CANCEL_SHARED and handle["id"] and now - handle["checked_at"] >= MODEL_CANCEL_POLL_SEC:
+        handle["checked_at"] = now
+        if os.path.exists(model_cancel_path(handle["id"])):
+            trigger_model_request_cancel(handle)
+    return handle["cancelled"].is_set()
+
+def add_model_request_closer(handle: dict, closer):
+    with _model_requests_lock:
+        handle["closers"].append(closer)
+        cancelled = handle["cancelled"].is_set()
+    if cancelled:
+        closer()
+
+def remove_model_request_closer(handle: dict, closer):
+    with _model_requests_lock:
+        if closer in handle["closers"]:
+            handle["closers"].remove(closer)
+
+def prune_model_cancel_markers():
+    cutoff = time.time() - MODEL_CANCEL_MARKER_TTL_SEC
+    markers = []
+    try:
+        names = os.listdir(MODEL_CANCEL_DIR)
+    except OSError:
+        return
+
+    for name in names:
+        path = model_cancel_path(name)
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime < cutoff:
+                os.remove(path)
+            else:
+                markers.append((mtime, path))
+        except OSError:
+            pass
+
+    markers.sort()
+    for _, path in markers[:max(0, len(markers) - MODEL_CANCEL_MARKER_LIMIT + 1)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def cancel_model_request(request_id: str) -> bool:
+    if not REQUEST_ID_PATTERN.fullmatch(request_id or ""):
+        return False
+
+    with _model_requests_lock:
+        handle = _model_requests.get(request_id)
+
+    if handle is not None:
+        trigger_model_request_cancel(handle)
+        return True
+
+    # Only other worker processes could still own the id; a single process already finished it.
+    if not MODEL_CANCEL_SHARED:
+        return False
+
+    os.makedirs(MODEL_CANCEL_DIR, exist_ok=True)
+    prune_model_cancel_markers()
+    write_file_atomic(model_cancel_path(request_id), str(time.time()))
+    return False
+
+@app.route('/cancel-request', methods=['POST'])
+def cancel_request():
+    data = request.get_json(force=True, silent=True) or {}
+    request_id = (data.get("request_id") or "").strip()
+    client_id = data.get("client_id") if isinstance(data.get("client_id"), str) else ""
+
+    if not REQUEST_ID_PATTERN.fullmatch(request_id):
+        return jsonify({"error": "A valid request id is required."}), 400
+
+    # Graph jobs are shared between pages, so a page only gives up its own claim on them.
+    released = release_graph_job(request_id, client_id)
+    if released is None and not os.path.exists(graph_job_path(request_id)):
+        released = cancel_model_request(request_id)
+
+    return jsonify({"request_id": request_id, "cancelled": bool(released)})
+
+def ollama_payload_key(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def call_ollama_cloud(
+    prompt: str,
+    num_ctx: int = None,
+    project_dir: str = "",
+    priority: int = MODEL_PRIORITY_INTERACTIVE,
+    is_cancelled=None,
+    request: dict = None
+) -> str:
+    payload = build_ollama_payload(prompt, num_ctx=num_ctx)
+    key = ollama_payload_key(payload)
+
+    while True:
+        with _inflight_calls_lock:
+            flight = _inflight_calls.get(key)
+            leader = flight is None
+            if leader:
+                flight = {"done": threading.Event(), "result": None, "error": None, "cancelled": False}
+                _inflight_calls[key] = flight
+
+        if leader:
+            try:
+                flight["result"] = request_ollama_generate(payload, project_dir, priority, is_cancelled, request)
+            except Exception as e:
+                flight["error"] = e
+                flight["cancelled"] = is_cancelled is not None and is_cancelled()
+                if not flight["cancelled"]:
+                    inc_metric("gamma_model_errors_total", kind="generate", error=type(e).__name__)
+            finally:
+                with _inflight_calls_lock:
+                    _inflight_calls.pop(key, None)
+                flight["done"].set()
+        else:
+            with _model_queue_cond:
+                _model_queue_counters["coalesced"] += 1
+            while not flight["done"].wait(0.25):
+                if is_cancelled is not None and is_cancelled():
+                    raise RuntimeError("Model call was cancelled while waiting for an identical request.")
+            if flight["cancelled"]:
+                continue
+
+        if flight["error"] is not None:
+            raise flight["error"]
+        return flight["result"]
+
+def request_ollama_generate(
+    payload: dict,
+    project_dir: str = "",
+    priority: int = MODEL_PRIORITY_INTERACTIVE,
+    is_cancelled=None,
+    request: dict = None
+) -> str:
+    headers = ollama_request_headers()
+    url = f"{OLLAMA_CLOUD_BASE_URL}/api/generate"
+
+    ticket = acquire_model_slot(project_dir, priority, is_cancelled)
+    try:
+        if is_cancelled is not None:
+            # Stream upstream so a cancelled caller can drop the connection between tokens.
+            raw_text = "".join(iter_ollama_stream(dict(payload, stream=True), "generate", is_cancelled, request))
+            return clean_model_response(raw_text.strip())
+
+        started = time.perf_counter()
+        resp = get_ollama_session().post(
+            url,
+            json=payload,
+            headers=headers,
+            timeout=(OLLAMA_CONNECT_TIMEOUT_SEC, OLLAMA_TIMEOUT_SEC)
+        )
+        headers_sec = resp.elapsed.total_seconds()
+        data = resp.json() if resp.ok else None
+        record_ollama_timing("generate", resp.status_code, started, headers_sec)
+    finally:
+        release_model_slot(ticket)
+
     resp.raise_for_status()
+    record_model_tokens(data)
 
-    data = resp.json()
     raw_text = (data.get("response") or "").strip()
     return clean_model_response(raw_text)
 
+def abort_ollama_response(resp):
+    # Shutting the socket down wakes the thread blocked in iter_lines, which then closes the response itself.
+    connection = getattr(resp.raw, "connection", None) or getattr(resp.raw, "_connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+def iter_ollama_stream(payload: dict, kind: str = "stream", is_cancelled=None, request: dict = None):
+    started = time.perf_counter()
+    first_token_sec = None
+
+    with get_ollama_session().post(
+        f"{OLLAMA_CLOUD_BASE_URL}/api/generate",
+        json=payload,
+        headers=ollama_request_headers(),
+        timeout=(OLLAMA_CONNECT_TIMEOUT_SEC, OLLAMA_TIMEOUT_SEC),
+        stream=True
+    ) as resp:
+        headers_sec = resp.elapsed.total_seconds()
+
+        def closer():
+            abort_ollama_response(resp)
+
+        if request is not None:
+            add_model_request_closer(request, closer)
+        try:
+            resp.raise_for_status()
+
+            for line in resp.iter_lines():
+                if is_cancelled is not None and is_cancelled():
+                    raise RuntimeError("Model call was cancelled.")
+                if not line:
+                    continue
+
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+
+                token = data.get("response") or ""
+                if token and first_token_sec is None:
+                    first_token_sec = time.perf_counter() - started
+                # Empty chunks (thinking, whitespace) are passed on so streaming callers can send keep-alives.
+                yield token
+
+                if data.get("done"):
+                    record_model_tokens(data)
+                    break
+        except Exception as e:
+            if is_cancelled is not None and is_cancelled() and not isinstance(e, RuntimeError):
+                raise RuntimeError("Model call was cancelled.") from e
+            raise
+        finally:
+            if request is not None:
+                remove_model_request_closer(request, closer)
+            record_ollama_timing(kind, resp.status_code, started, headers_sec, first_token_sec)
+
+def stream_ollama_cloud(prompt: str, num_ctx: int = None, ticket: dict = None, is_cancelled=None, request: dict = None):
+    payload = build_ollama_payload(prompt, stream=True, num_ctx=num_ctx)
+
+    owns_ticket = ticket is None
+    if owns_ticket:
+        ticket = acquire_model_slot(is_cancelled=is_cancelled)
+
+    try:
+        yield from iter_ollama_stream(payload, "stream", is_cancelled, request)
+    except Exception as e:
+        if is_cancelled is None or not is_cancelled():
+            inc_metric("gamma_model_errors_total", kind="stream", error=type(e).__name__)
+        raise
+    finally:
+        if owns_ticket:
+            release_model_slot(ticket)
+
+_async_ollama_client = None
+_async_inflight_calls = {}
+
+def get_async_ollama_client():
+    global _async_ollama_client
+
+    if _async_ollama_client is None:
+        _async_ollama_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(OLLAMA_TIMEOUT_SEC, connect=OLLAMA_CONNECT_TIMEOUT_SEC),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=OLLAMA_POOL_SIZE),
+            transport=httpx.AsyncHTTPTransport(retries=OLLAMA_MAX_RETRIES),
+            headers={"Connection": "keep-alive"}
+        )
+    return _async_ollama_client
+
+async def close_async_ollama_client():
+    global _async_ollama_client
+
+    if _async_ollama_client is not None:
+        await _async_ollama_client.aclose()
+        _async_ollama_client = None
+
+async def acquire_model_slot_async(project_dir: str = "", priority: int = MODEL_PRIORITY_INTERACTIVE) -> dict:
+    loop = asyncio.get_running_loop()
+    granted = loop.create_future()
+
+    def resolve():
+        if not granted.done():
+            granted.set_result(True)
+
+    def on_granted():
+        # Runs in dispatch_model_calls on whichever thread freed the slot.
+        try:
+            loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            pass
+
+    ticket = enqueue_model_call(project_dir, priority, on_granted)
+
+    try:
+        await asyncio.wait_for(granted, OLLAMA_QUEUE_TIMEOUT_SEC)
+    except asyncio.TimeoutError:
+        if cancel_model_call(ticket):
+            with _model_queue_cond:
+                _model_queue_counters["timed_out"] += 1
+            raise TimeoutError(f"No model slot became free within {OLLAMA_QUEUE_TIMEOUT_SEC:g}s.")
+    except asyncio.CancelledError:
+        cancel_model_call(ticket)
+        release_model_slot(ticket)
+        raise
+
+    return ticket
+
+def ollama_retry_delay(resp, attempt: int) -> float:
+    retry_after = resp.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(OLLAMA_RETRY_BACKOFF_MAX_SEC, Retry().parse_retry_after(retry_after))
+        except Exception:
+            pass
+    return min(OLLAMA_RETRY_BACKOFF_MAX_SEC, OLLAMA_RETRY_BACKOFF_SEC * (2 ** (attempt - 1)))
+
+async def async_send_ollama(payload: dict, stream: bool = False):
+    # httpx only retries failed connections, so 429/5xx answers are retried here like the sync session does.
+    client = get_async_ollama_client()
+    request = client.build_request(
+        "POST",
+        f"{OLLAMA_CLOUD_BASE_URL}/api/generate",
+        json=payload,
+        headers=ollama_request_headers()
+    )
+
+    attempt = 0
+    while True:
+        resp = await client.send(request, stream=stream)
+        if resp.status_code not in OLLAMA_RETRY_STATUSES or attempt >= OLLAMA_MAX_RETRIES:
+            return resp
+
+        attempt += 1
+        await resp.aclose()
+        delay = ollama_retry_delay(resp, attempt)
+        app.logger.debug("Ollama answered %s, retry %s in %.1fs", resp.status_code, attempt, delay)
+        await asyncio.sleep(delay)
+
+async def async_request_ollama_generate(payload: dict, project_dir: str = "", priority: int = MODEL_PRIORITY_INTERACTIVE) -> str:
+    ticket = await acquire_model_slot_async(project_dir, priority)
+    try:
+        started = time.perf_counter()
+        resp = await async_send_ollama(payload)
+        record_ollama_timing("generate-async", resp.status_code, started, resp.elapsed.total_seconds())
+        resp.raise_for_status()
+    except Exception as e:
+        inc_metric("gamma_model_errors_total", kind="generate-async", error=type(e).__name__)
+        raise
+    finally:
+        release_model_slot(ticket)
+
+    data = resp.json()
+    record_model_tokens(data)
+    return clean_model_response((data.get("response") or "").strip())
+
+async def async_call_ollama_cloud(
+    prompt: str,
+    num_ctx: int = None,
+    project_dir: str = "",
+    priority: int = MODEL_PRIORITY_INTERACTIVE
+) -> str:
+    payload = build_ollama_payload(prompt, num_ctx=num_ctx)
+    key = ollama_payload_key(payload)
+
+    def forget(_=None):
+        if _async_inflight_calls.get(key) is flight:
+            del _async_inflight_calls[key]
+
+    flight = _async_inflight_calls.get(key)
+    if flight is None:
+        flight = {"task": asyncio.ensure_future(async_request_ollama_generate(payload, project_dir, priority)), "waiters": 0}
+        _async_inflight_calls[key] = flight
+        flight["task"].add_done_callback(forget)
+    else:
+        with _model_queue_cond:
+            _model_queue_counters["coalesced"] += 1
+
+    flight["waiters"] += 1
+    try:
+        return await asyncio.shield(flight["task"])
+    except asyncio.CancelledError:
+        if flight["waiters"] == 1:
+            # Forget the dying call right away so an identical request starts a fresh one.
+            forget()
+            flight["task"].cancel()
+        raise
+    finally:
+        flight["waiters"] -= 1
+
+async def async_stream_ollama_cloud(prompt: str, num_ctx: int = None, ticket: dict = None):
+    payload = build_ollama_payload(prompt, stream=True, num_ctx=num_ctx)
+
+    owns_ticket = ticket is None
+    if owns_ticket:
+        ticket = await acquire_model_slot_async()
+
+    started = time.perf_counter()
+    first_token_sec = None
+
+    try:
+        resp = await async_send_ollama(payload, stream=True)
+        headers_sec = time.perf_counter() - started
+        try:
+            resp.raise_for_status()
+
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+
+                token = data.get("response") or ""
+                if token:
+                    if first_token_sec is None:
+                        first_token_sec = time.perf_counter() - started
+                    yield token
+
+                if data.get("done"):
+                    record_model_tokens(data)
+                    break
+        finally:
+            await resp.aclose()
+            record_ollama_timing("stream-async", resp.status_code, started, headers_sec, first_token_sec)
+    except Exception as e:
+        inc_metric("gamma_model_errors_total", kind="stream-async", error=type(e).__name__)
+        raise
+    finally:
+        if owns_ticket:
+            release_model_slot(ticket)
+
+@timed_stage("json_extract")
 def extract_outer_json(text: str) -> str:
     text = (text or "").strip()
     start = text.find("{")
@@ -386,34 +2563,57 @@ def extract_outer_json(text: str) -> str:
         return text[start:end + 1]
     return text
 
-def extract_event_reference_map(summary_text: str) -> dict:
-    object_names = re.findall(r"// === Object: ([^=\n]+) ===", summary_text or "")
-    known = {name.strip() for name in object_names if name.strip()}
+SUMMARY_SECTION_PATTERN = re.compile(
+    r"^// (?:=== (?:Object: ([^=\n]+?) ===|End of all objects ===)|--- Event: ([^\n]+?) ---)$",
+    re.MULTILINE
+)
+SUMMARY_WORD_PATTERN = re.compile(r"\w+")
+_reference_maps = OrderedDict()
+_reference_maps_lock = threading.Lock()
+
+def scan_event_references(summary_text: str) -> dict:
+    text = summary_text or ""
+    known = {name.strip() for name in SUMMARY_OBJECT_PATTERN.findall(text) if name.strip()}
     event_map = {}
+    source_obj = None
+    event_name = None
+    pos = 0
+
+    def collect(end: int):
+        if not (source_obj and event_name):
+            return
+        for target_obj in known.intersection(SUMMARY_WORD_PATTERN.findall(text, pos, end)):
+            if target_obj != source_obj:
+                event_map.setdefault((source_obj, target_obj), set()).add(event_name)
+
+    for match in SUMMARY_SECTION_PATTERN.finditer(text):
+        collect(match.start())
+        if match.group(2) is not None:
+            event_name = match.group(2).strip() if source_obj else None
+        else:
+            source_obj = (match.group(1) or "").strip() or None
+            event_name = None
+        pos = match.end()
 
-    section_pattern = re.compile(
-        r"// === Object: ([^=\n]+) ===\n\n(.*?)(?=\n// === Object: |\n// === End of all objects ===)",
-        re.DOTALL
-    )
-    event_pattern = re.compile(
-        r"// --- Event: ([^\n]+) ---\n(.*?)(?=\n// --- Event: |\Z)",
-        re.DOTALL
-    )
+    collect(len(text))
+    return {key: sorted(values) for key, values in event_map.items()}
 
-    for match in section_pattern.finditer(summary_text or ""):
-        source_obj = match.group(1).strip()
-        block = match.group(2)
+def extract_event_reference_map(summary_text: str) -> dict:
+    key = hashlib.sha1((summary_text or "").encode("utf-8")).hexdigest()
+    with _reference_maps_lock:
+        event_map = _reference_maps.get(key)
+        if event_map is not None:
+            _reference_maps.move_to_end(key)
+            return event_map
 
-        for event_match in event_pattern.finditer(block):
-            event_name = event_match.group(1).strip()
-            event_block = event_match.group(2)
+    event_map = scan_event_references(summary_text)
 
-            refs = sorted(set(re.findall(r"\b(obj_[A-Za-z0-9_]+|o_[A-Za-z0-9_]+)\b", event_block)))
-            for target_obj in refs:
-                if target_obj in known and target_obj != source_obj:
-                    event_map.setdefault((source_obj, target_obj), set()).add(event_name)
+    with _reference_maps_lock:
+        _reference_maps[key] = event_map
+        while len(_reference_maps) > SUMMARY_CACHE_SIZE:
+            _reference_maps.popitem(last=False)
 
-    return {key: sorted(values) for key, values in event_map.items()}
+    return event_map
 
 
 def enrich_graph_with_event_data(graph: dict, summary_text: str) -> dict:
@@ -499,6 +2699,7 @@ def filter_connected_nodes(graph: dict, selected_object: str = "", keep_selected
         "edges": filtered_edges
     }
 
+@timed_stage("graph_normalize")
 def normalize_project_graph(graph: dict, selected_object: str = "") -> dict:
     if not isinstance(graph, dict):
         return {"nodes": [], "edges": []}
@@ -575,50 +2776,462 @@ def normalize_project_graph(graph: dict, selected_object: str = "") -> dict:
         keep_selected=True
     )
 
-def build_project_graph_fallback(summary_text: str, selected_object: str = "") -> dict:
-    object_names = re.findall(r"// === Object: ([^=\n]+) ===", summary_text or "")
-    object_names = [name.strip() for name in object_names if name.strip()]
+GRAPH_LLM_ENRICHMENT = os.getenv("GAMMA_GRAPH_LLM_ENRICHMENT", "0").strip().lower() in ("1", "true", "yes")
+GRAPH_PROMPT_VERSION = 2
+GRAPH_CACHE_DIR = os.path.join(SUMMARY_STORE_DIR, "graphs")
+GRAPH_CACHE_SIZE = max(1, int(os.getenv("GAMMA_GRAPH_CACHE_SIZE", "32")))
+
+_graph_cache = OrderedDict()
+_graph_cache_lock = threading.Lock()
+_project_graph_states = OrderedDict()
+_graph_state_lock = threading.Lock()
+GRAPH_JOB_WORKERS = max(1, int(os.getenv("GAMMA_GRAPH_JOB_WORKERS", "2")))
+GRAPH_JOB_TTL_SEC = float(os.getenv("GAMMA_GRAPH_JOB_TTL_SEC", "600"))
+GRAPH_JOB_ABANDON_SEC = float(os.getenv("GAMMA_GRAPH_JOB_ABANDON_SEC", "30"))
+GRAPH_PATCH_VERIFY = os.getenv("GAMMA_GRAPH_PATCH_VERIFY", "0").strip().lower() in ("1", "true", "yes")
+_graph_job_pool = ThreadPoolExecutor(max_workers=GRAPH_JOB_WORKERS, thread_name_prefix="gamma-graph")
+_graph_jobs = {}
+_graph_jobs_by_key = {}
+_graph_jobs_lock = threading.Lock()
+
+GML_COMMENT_OR_STRING_PATTERN = re.compile(
+    r'@"[^"]*"|@\'[^\']*\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|//[^\n]*|/\*.*?\*/',
+    re.DOTALL
+)
+GML_CALL_RULES = (
+    ("creates", re.compile(r"\binstance_create(?:_layer|_depth)?\s*\(")),
+    ("destroys", re.compile(r"\binstance_destroy\s*\(")),
+    ("controls", re.compile(r"\bwith\s*\(")),
+    ("collides_with", re.compile(r"\b(?:place_meeting|instance_place(?:_list)?|position_meeting|instance_position(?:_list)?|collision_[a-z_]+)\s*\(")),
+    ("changes_room_to", re.compile(r"\broom_goto\s*\("))
+)
+GML_WITH_BARE_PATTERN = re.compile(r"\bwith\s+([A-Za-z_][A-Za-z0-9_]*)")
+SUMMARY_OBJECT_PATTERN = re.compile(r"^// === Object: ([^=\n]+) ===$", re.MULTILINE)
+SUMMARY_PARENT_PATTERN = re.compile(r"^// === Object: ([^=\n]+) ===\n\n// Parent: ([^\n]+)$", re.MULTILINE)
+
+def strip_gml_comments(code: str) -> str:
+    def replace(match):
+        token = match.group(0)
+        if token.startswith("//"):
+            return ""
+        if token.startswith("/*"):
+            return "\n" * token.count("\n")
+        return token
+
+    return GML_COMMENT_OR_STRING_PATTERN.sub(replace, code or "")
+
+PROMPT_COMPRESSION = os.getenv("GAMMA_PROMPT_COMPRESSION", "1").strip().lower() in ("1", "true", "yes")
+PROMPT_DEDUP_MIN_CHARS = max(1, int(os.getenv("GAMMA_PROMPT_DEDUP_MIN_CHARS", "40")))
+PROMPT_CODE_LEGEND = "// Format: '## object', '# event: file', '= same as object/file' marks repeated code. Comments were removed.\n"
+SUMMARY_BANNER_PREFIXES = ("// ====", "// Combined GML code", "// Generated on:", "// Project: ")
+SUMMARY_END_MARKER = "// === End of all objects ==="
+
+@lru_cache(maxsize=32)
+def compress_summary_text(text: str) -> str:
+    out = []
+    seen = {}
+    code_lines = []
+    obj = event = filename = ""
+    has_objects = False
+
+    def flush():
+        code = "\n".join(
+            line.strip() for line in strip_gml_comments("".join(code_lines)).splitlines() if line.strip()
+        )
+        code_lines.clear()
+        if not code:
+            return
+
+        ref = f"{obj}/{filename or event}"
+        if len(code) >= PROMPT_DEDUP_MIN_CHARS and seen.setdefault(code, ref) != ref:
+            out.append(f"= same as {seen[code]}\n")
+        else:
+            out.append(code + "\n")
+
+    for line in (text or "").splitlines(keepends=True):
+        if line.startswith("// === Object: "):
+            flush()
+            obj = line[len("// === Object: "):].rstrip().rstrip("=").strip()
+            event = filename = ""
+            has_objects = True
+            out.append(f"## {obj}\n")
+        elif line.rstrip() == SUMMARY_END_MARKER:
+            flush()
+            obj = event = filename = ""
+        elif not obj and line.startswith(SUMMARY_BANNER_PREFIXES):
+            # Banner lines only exist outside object fragments; inside them they are event code.
+            continue
+        elif line.startswith("// --- Event: ") and obj:
+            flush()
+            event = line[len("// --- Event: "):].rstrip().rstrip("-").strip()
+            filename = ""
+            out.append(f"# {event}\n")
+        elif line.startswith("// File: ") and obj:
+            flush()
+            filename = line[len("// File: "):].strip()
+            if out and out[-1] == f"# {event}\n":
+                out.pop()
+            out.append(f"# {event}: {filename}\n")
+        elif line.startswith("// Parent: ") and obj and not event:
+            out.append(f"parent: {line[len('// Parent: '):].strip()}\n")
+        elif obj:
+            code_lines.append(line)
+        elif line.strip():
+            out.append(line.strip() + "\n")
+
+    flush()
+
+    if not has_objects:
+        return "".join(out)
+    return PROMPT_CODE_LEGEND + "".join(out)
+
+def prepare_prompt_code(text: str) -> str:
+    return compress_summary_text(text) if PROMPT_COMPRESSION and text else text
+
+def split_event_block_files(block: str) -> list:
+    files = []
+    filename = ""
+    lines = []
+
+    for line in (block or "").splitlines(keepends=True):
+        if line.startswith("// File: "):
+            if filename or "".join(lines).strip():
+                files.append((filename, "".join(lines)))
+            filename = line[len("// File: "):].strip()
+            lines = []
+        else:
+            lines.append(line)
+
+    if filename or "".join(lines).strip():
+        files.append((filename, "".join(lines)))
+
+    return files
+
+def extract_call_arguments(code: str, start: int) -> str:
+    depth = 1
+    pos = start
+    while pos < len(code) and depth:
+        char = code[pos]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        pos += 1
+    return code[start:pos - 1] if depth == 0 else code[start:pos]
+
+def analyze_event_code(code: str, known_objects: set, filename: str = "") -> set:
+    edges = set()
+
+    for label, pattern in GML_CALL_RULES:
+        for match in pattern.finditer(code):
+            args = extract_call_arguments(code, match.end())
+            if label == "changes_room_to":
+                room = args.strip()
+                if IDENTIFIER_PATTERN.fullmatch(room):
+                    edges.add((room, label))
+                continue
+
+            for name in IDENTIFIER_PATTERN.findall(args):
+                if name in known_objects:
+                    edges.add((name, label))
+
+    for match in GML_WITH_BARE_PATTERN.finditer(code):
+        if match.group(1) in known_objects:
+            edges.add((match.group(1), "controls"))
+
+    base = os.path.splitext(filename)[0]
+    if base.startswith("Collision_"):
+        target = base[len("Collision_"):]
+        if target in known_objects:
+            edges.add((target, "collides_with"))
+
+    return edges
+
+def analyze_event_block(source_obj: str, block: str, known_objects: set) -> set:
+    edges = set()
+    referenced = set()
+
+    for filename, code in split_event_block_files(block):
+        code = strip_gml_comments(code)
+        edges.update(analyze_event_code(code, known_objects, filename))
+        referenced.update(name for name in IDENTIFIER_PATTERN.findall(code) if name in known_objects)
+
+    typed_targets = {target for target, _ in edges}
+    edges.update((name, "references") for name in referenced - typed_targets)
+    return {(target, label) for target, label in edges if target != source_obj}
+
+def analyze_project_summary(summary_text: str) -> dict:
+    objects = [name.strip() for name in SUMMARY_OBJECT_PATTERN.findall(summary_text or "") if name.strip()]
+    known = set(objects)
+    parents = {
+        child.strip(): parent.strip()
+        for child, parent in SUMMARY_PARENT_PATTERN.findall(summary_text or "")
+    }
+
+    event_edges = {}
+    for obj, event, block in iter_summary_event_blocks(summary_text):
+        event_edges[(obj, event)] = analyze_event_block(obj, block, known)
+
+    return {
+        "objects": objects,
+        "parents": parents,
+        "event_edges": event_edges
+    }
+
+def find_summary_event_block(summary_text: str, obj: str, event: str):
+    header = f"// === Object: {obj} ===\n"
+    start = summary_text.find(header)
+    if start == -1:
+        return None
+
+    ends = [
+        summary_text.find(marker, start + len(header))
+        for marker in ("\n// === Object: ", "\n// === End of all objects ===")
+    ]
+    obj_end = min((end + 1 for end in ends if end != -1), default=len(summary_text))
+
+    for _, name, block in iter_summary_event_blocks(summary_text[start:obj_end]):
+        if name == event:
+            return block
+    return None
+
+def aggregate_object_edges(analysis: dict, source_obj: str) -> dict:
+    edge_events = {}
+    for (obj, event), targets in analysis["event_edges"].items():
+        if obj != source_obj:
+            continue
+        for target, label in targets:
+            edge_events.setdefault((obj, target, label), set()).add(event)
+
+    parent = analysis["parents"].get(source_obj)
+    if parent and parent != source_obj and parent in analysis["objects"]:
+        edge_events.setdefault((source_obj, parent, "inherits_from"), set())
+
+    return edge_events
+
+def build_graph_state(summary_entry: dict) -> dict:
+    analysis = analyze_project_summary(summary_entry["text"])
+    edge_events = {}
+    for obj in analysis["objects"]:
+        edge_events.update(aggregate_object_edges(analysis, obj))
+
+    return {
+        "summary_hash": summary_entry["hash"],
+        "analysis": analysis,
+        "edge_events": edge_events
+    }
+
+def graph_edge_id(source_obj: str, target: str, label: str) -> str:
+    return f"{source_obj}__{target}__{label}"
+
+def build_graph_edge(key: tuple, events) -> dict:
+    source_obj, target, label = key
+    event_names = sorted(events)
+    return {
+        "id": graph_edge_id(source_obj, target, label),
+        "from": source_obj,
+        "to": target,
+        "label": label,
+        "title": f"{label}\nEvents: {', '.join(event_names)}" if event_names else label,
+        "event_names": event_names
+    }
+
+def build_graph_node(node_id: str, analysis: dict) -> dict:
+    if node_id not in analysis["objects"]:
+        return {"id": node_id, "label": node_id, "title": f"Room: {node_id}", "type": "room"}
+
+    parent = analysis["parents"].get(node_id)
+    title = f"{node_id}\nParent: {parent}" if parent else node_id
+    return {"id": node_id, "label": node_id, "title": title, "type": "object"}
+
+def graph_from_state(state: dict) -> dict:
+    analysis = state["analysis"]
+    known = set(analysis["objects"])
+    rooms = sorted({
+        target for (_, target, label) in state["edge_events"]
+        if label == "changes_room_to" and target not in known
+    })
+
+    return {
+        "nodes": [build_graph_node(node_id, analysis) for node_id in analysis["objects"] + rooms],
+        "edges": [build_graph_edge(key, events) for key, events in sorted(state["edge_events"].items())],
+        "meta": {"engine": "static"}
+    }
+
+@timed_stage("graph_static")
+def get_project_graph_state(project_dir: str, summary_entry: dict) -> dict:
+    key = project_store_key(project_dir)
+    with _graph_state_lock:
+        state = _project_graph_states.get(key)
+        if state is not None and state["summary_hash"] == summary_entry["hash"]:
+            _project_graph_states.move_to_end(key)
+            return state
+
+    state = build_graph_state(summary_entry)
+
+    with _graph_state_lock:
+        _project_graph_states[key] = state
+        _project_graph_states.move_to_end(key)
+        while len(_project_graph_states) > SUMMARY_CACHE_SIZE:
+            _project_graph_states.popitem(last=False)
+
+    return state
+
+def update_project_graph_for_event(project_dir: str, object_name: str, event: str, previous_hash: str):
+    summary_entry = get_summary_entry(project_dir)
+    if not summary_entry:
+        return None
+
+    summary_text = summary_entry["text"]
+    key = project_store_key(project_dir)
+
+    with _graph_state_lock:
+        state = _project_graph_states.get(key)
+        if state is None:
+            return None
+        if state["summary_hash"] != previous_hash:
+            del _project_graph_states[key]
+            return None
+
+        analysis = state["analysis"]
+        objects = [name.strip() for name in SUMMARY_OBJECT_PATTERN.findall(summary_text) if name.strip()]
+        parents = {
+            child.strip(): parent.strip()
+            for child, parent in SUMMARY_PARENT_PATTERN.findall(summary_text)
+        }
+        if objects != analysis["objects"] or parents != analysis["parents"]:
+            del _project_graph_states[key]
+            return None
+
+        block = find_summary_event_block(summary_text, object_name, event)
+        if block is None:
+            analysis["event_edges"].pop((object_name, event), None)
+        else:
+            analysis["event_edges"][(object_name, event)] = analyze_event_block(object_name, block, set(objects))
+
+        before = {k: v for k, v in state["edge_events"].items() if k[0] == object_name}
+        after = aggregate_object_edges(analysis, object_name)
+
+        for k in before:
+            del state["edge_events"][k]
+        state["edge_events"].update(after)
+        state["summary_hash"] = summary_entry["hash"]
+
+        if GRAPH_PATCH_VERIFY and state["edge_events"] != build_graph_state(summary_entry)["edge_events"]:
+            app.logger.warning("Graph patch for %s/%s diverged from a full rebuild", object_name, event)
+            del _project_graph_states[key]
+            return None
+
+        added = [build_graph_edge(k, after[k]) for k in sorted(after) if k not in before]
+        updated = [build_graph_edge(k, after[k]) for k in sorted(after) if k in before and before[k] != after[k]]
+        removed = [graph_edge_id(*k) for k in sorted(before) if k not in after]
+
+        endpoints = {edge[side] for edge in added + updated for side in ("from", "to")}
+        patch = {
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+            "nodes": [build_graph_node(node_id, analysis) for node_id in sorted(endpoints)],
+            "summary_hash": summary_entry["hash"]
+        }
+        graph = graph_from_state(state)
+
+    store_cached_graph(graph_cache_key(project_dir, summary_entry["hash"], False), graph, persist=False)
+    return patch
+
+def event_from_filename(filename: str) -> str:
+    return os.path.splitext(os.path.basename(filename))[0].split("_", 1)[0]
 
+def merge_project_graphs(static_graph: dict, llm_graph: dict) -> dict:
+    nodes = {node["id"]: dict(node) for node in static_graph.get("nodes", [])}
+    for node in llm_graph.get("nodes", []):
+        existing = nodes.get(node["id"])
+        if existing is None:
+            nodes[node["id"]] = dict(node)
+        elif node.get("title") and node["title"] != node["id"]:
+            existing["title"] = f"{node['title']}\n{existing['title']}" if existing.get("type") == "object" else node["title"]
+
+    edges = {(edge["from"], edge["to"], edge["label"]): edge for edge in static_graph.get("edges", [])}
+    for edge in llm_graph.get("edges", []):
+        edges.setdefault((edge["from"], edge["to"], edge["label"]), edge)
+
+    return {
+        "nodes": list(nodes.values()),
+        "edges": list(edges.values())
+    }
+
+def apply_graph_selection(graph: dict, selected_object: str = "") -> dict:
     nodes = []
-    for obj in object_names:
-        node = {
-            "id": obj,
-            "label": obj,
-            "title": obj
-        }
-        if selected_object and obj == selected_object:
-            node["is_selected"] = True
-        nodes.append(node)
+    for node in graph.get("nodes", []) or []:
+        item = {key: value for key, value in node.items() if key != "is_selected"}
+        if selected_object and item.get("id") == selected_object:
+            item["is_selected"] = True
+        nodes.append(item)
 
-    event_map = extract_event_reference_map(summary_text)
     edges = []
+    for edge in graph.get("edges", []) or []:
+        if "id" not in edge:
+            edge = dict(edge, id=graph_edge_id(edge.get("from", ""), edge.get("to", ""), edge.get("label", "")))
+        edges.append(edge)
 
-    for (source_obj, target_obj), event_names in sorted(event_map.items()):
-        edges.append({
-            "from": source_obj,
-            "to": target_obj,
-            "label": "references",
-            "title": f"Referenz in Events: {', '.join(event_names)}",
-            "event_names": event_names
-        })
-
-    return filter_connected_nodes(
+    selected = filter_connected_nodes(
         {"nodes": nodes, "edges": edges},
         selected_object=selected_object,
         keep_selected=True
     )
-
-def build_project_knowledge_graph(project_dir: str, selected_object: str = "") -> dict:
-    summary_text = read_combined_summary()
-
-    if not summary_text.strip():
-        build_all_objects_summary(project_dir)
-        summary_text = read_combined_summary()
-
-    if not summary_text.strip():
-        return {"nodes": [], "edges": []}
-
-    prompt = f"""
+    selected["meta"] = dict(graph.get("meta") or {})
+    return selected
+
+def graph_cache_key(project_dir: str, summary_hash: str, use_llm: bool) -> str:
+    model = OLLAMA_CLOUD_MODEL if use_llm else "static"
+    raw = f"{project_store_key(project_dir)}|{summary_hash}|{GRAPH_PROMPT_VERSION}|{model}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def load_cached_graph(cache_key: str) -> tuple:
+    with _graph_cache_lock:
+        graph = _graph_cache.get(cache_key)
+        if graph is not None:
+            _graph_cache.move_to_end(cache_key)
+            inc_metric("gamma_cache_requests_total", cache="graph", result="memory")
+            return graph, "memory"
+
+    path = os.path.join(GRAPH_CACHE_DIR, f"{cache_key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            graph = json.load(f)
+    except (OSError, ValueError):
+        inc_metric("gamma_cache_requests_total", cache="graph", result="miss")
+        return None, "miss"
+
+    store_cached_graph(cache_key, graph, persist=False)
+    inc_metric("gamma_cache_requests_total", cache="graph", result="disk")
+    return graph, "disk"
+
+def store_cached_graph(cache_key: str, graph: dict, persist: bool = True):
+    with _graph_cache_lock:
+        _graph_cache[cache_key] = graph
+        _graph_cache.move_to_end(cache_key)
+        while len(_graph_cache) > GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)
+
+    if persist:
+        os.makedirs(GRAPH_CACHE_DIR, exist_ok=True)
+        write_file_atomic(os.path.join(GRAPH_CACHE_DIR, f"{cache_key}.json"), json.dumps(graph))
+
+@timed_stage("graph_prompt")
+def build_project_graph_prompt(summary_entry: dict, project_dir: str = "") -> dict:
+    summary_text = summary_entry["text"]
+    condensed = get_condensed_summary(project_dir, summary_text) if project_dir else None
+
+    def shrink_summary(tokens):
+        if condensed and not condensed["missing"]:
+            return render_condensed_context(condensed, tokens)
+        return prepare_prompt_code(select_chat_context(
+            summary_text, summary_entry["hash"], "", token_budget=tokens, top_k=None
+        )["text"])
+
+    sections = [
+        prompt_section("instructions", f"""
     You analyze a GameMaker project summary and return ONLY valid JSON.
 
     Task:
@@ -636,9 +3249,6 @@ def build_project_knowledge_graph(project_dir: str, selected_object: str = "") -
     - Maximum 80 nodes.
     - Maximum 140 edges.
 
-    Selected object:
-    {selected_object or "none"}
-
     Required JSON schema:
     {{
     "nodes": [
@@ -659,38 +3269,224 @@ def build_project_knowledge_graph(project_dir: str, selected_object: str = "") -
     }}
 
     Project summary:
-    {summary_text}
-    """.strip()
+""", priority=100, required=True),
+        prompt_section("project_summary", f"""
+    {prepare_prompt_code(summary_text)}
+    """, priority=10, shrink=shrink_summary)
+    ]
 
-    try:
-        raw = call_ollama_cloud(prompt)
-        parsed = json.loads(extract_outer_json(raw))
-        normalized = normalize_project_graph(parsed, selected_object)
-        enriched = enrich_graph_with_event_data(normalized, summary_text)
+    return assemble_prompt(sections)
 
-        if enriched.get("nodes"):
-            return enriched
-    except Exception:
-        pass
+def build_project_knowledge_graph(project_dir: str, selected_object: str = "", enrich: bool = None, client_id: str = "") -> dict:
+    summary_entry = get_summary_entry(project_dir)
+
+    if not summary_entry or not summary_entry["text"].strip():
+        build_all_objects_summary(project_dir)
+        summary_entry = get_summary_entry(project_dir)
+
+    if not summary_entry or not summary_entry["text"].strip():
+        return {"nodes": [], "edges": []}
+
+    use_llm = GRAPH_LLM_ENRICHMENT if enrich is None else enrich
+    cache_key = graph_cache_key(project_dir, summary_entry["hash"], use_llm)
+    graph, cache_state = load_cached_graph(cache_key)
+    job = None
+
+    if graph is None:
+        graph = graph_from_state(get_project_graph_state(project_dir, summary_entry))
+        if use_llm:
+            job = submit_graph_job(project_dir, cache_key, summary_entry, graph, client_id)
+            inc_metric("gamma_graph_fallbacks_total", reason="pending")
+        else:
+            store_cached_graph(cache_key, graph, persist=False)
+
+    result = apply_graph_selection(graph, selected_object)
+    result["meta"]["cache"] = cache_state
+    if job:
+        result["meta"]["job"] = job
+    return result
+
+def enrich_project_graph(summary_entry: dict, static_graph: dict, project_dir: str = "", is_cancelled=None, request: dict = None) -> dict:
+    assembled = build_project_graph_prompt(summary_entry, project_dir)
+    raw = call_ollama_cloud(
+        assembled["prompt"],
+        num_ctx=assembled["num_ctx"],
+        project_dir=project_dir,
+        priority=MODEL_PRIORITY_BACKGROUND,
+        is_cancelled=is_cancelled,
+        request=request
+    )
+    parsed = json.loads(extract_outer_json(raw))
+    normalized = normalize_project_graph(parsed)
+    enriched = enrich_graph_with_event_data(normalized, summary_entry["text"])
+
+    if not enriched.get("nodes"):
+        raise ValueError("Model returned an empty graph.")
+
+    merged = merge_project_graphs(static_graph, enriched)
+    merged["meta"] = {"engine": "static+llm", "budget": assembled["budget"]}
+    return merged
+
+def graph_job_snapshot(job: dict) -> dict:
+    return {key: job[key] for key in ("id", "status", "created_at", "finished_at", "error")}
+
+def graph_job_path(job_id: str) -> str:
+    return os.path.join(GRAPH_CACHE_DIR, "jobs", f"{job_id}.json")
+
+def persist_graph_job(job: dict):
+    os.makedirs(os.path.join(GRAPH_CACHE_DIR, "jobs"), exist_ok=True)
+    write_file_atomic(graph_job_path(job["id"]), json.dumps(dict(graph_job_snapshot(job), cache_key=job["cache_key"])))
+
+def prune_graph_jobs():
+    cutoff = time.time() - GRAPH_JOB_TTL_SEC
+    for job_id, job in list(_graph_jobs.items()):
+        if job["finished_at"] and job["finished_at"] < cutoff:
+            del _graph_jobs[job_id]
+            if _graph_jobs_by_key.get(job["cache_key"]) == job_id:
+                del _graph_jobs_by_key[job["cache_key"]]
+            try:
+                os.remove(graph_job_path(job_id))
+            except OSError:
+                pass
+
+def submit_graph_job(project_dir: str, cache_key: str, summary_entry: dict, static_graph: dict, client_id: str = "") -> dict:
+    with _graph_jobs_lock:
+        prune_graph_jobs()
+        job = _graph_jobs.get(_graph_jobs_by_key.get(cache_key, ""))
+        if job and job["status"] in ("queued", "running") and not job["request"]["cancelled"].is_set():
+            job["last_seen"] = time.time()
+            job["clients"].add(client_id)
+            return graph_job_snapshot(job)
+
+        job = {
+            "id": hashlib.sha1(f"{cache_key}|{os.getpid()}|{time.time()}".encode("utf-8")).hexdigest()[:16],
+            "cache_key": cache_key,
+            "project_dir": project_dir,
+            "status": "queued",
+            "created_at": time.time(),
+            "last_seen": time.time(),
+            "finished_at": None,
+            "error": "",
+            "graph": None,
+            "clients": {client_id}
+        }
+        job["request"] = open_model_request(job["id"])
+        _graph_jobs[job["id"]] = job
+        _graph_jobs_by_key[cache_key] = job["id"]
+
+    persist_graph_job(job)
+    _graph_job_pool.submit(run_graph_job, job, summary_entry, static_graph)
+    return graph_job_snapshot(job)
+
+def release_graph_job(job_id: str, client_id: str):
+    with _graph_jobs_lock:
+        job = _graph_jobs.get(job_id)
+        if job is None:
+            return None
+        job["clients"].discard(client_id)
+        if job["clients"]:
+            return False
+
+    trigger_model_request_cancel(job["request"])
+    return True
+
+def run_graph_job(job: dict, summary_entry: dict, static_graph: dict):
+    with _graph_jobs_lock:
+        job["status"] = "running"
+    persist_graph_job(job)
+
+    def is_abandoned() -> bool:
+        try:
+            polled_elsewhere = os.path.getmtime(graph_job_path(job["id"]))
+        except OSError:
+            polled_elsewhere = 0
+        return time.time() - max(job["last_seen"], polled_elsewhere) > GRAPH_JOB_ABANDON_SEC
+
+    def is_cancelled() -> bool:
+        return model_request_cancelled(job["request"]) or is_abandoned()
 
-    fallback = build_project_graph_fallback(summary_text, selected_object)
-    return enrich_graph_with_event_data(fallback, summary_text)
+    try:
+        graph = enrich_project_graph(summary_entry, static_graph, job["project_dir"], is_cancelled, job["request"])
+        store_cached_graph(job["cache_key"], graph)
+        status, error = "done", ""
+    except Exception as e:
+        graph, error = None, str(e)
+        status = "cancelled" if job["request"]["cancelled"].is_set() else "failed"
+        inc_metric("gamma_graph_fallbacks_total", reason=status)
+    finally:
+        close_model_request(job["request"])
+
+    with _graph_jobs_lock:
+        job["graph"] = graph
+        job["status"] = status
+        job["error"] = error
+        job["finished_at"] = time.time()
+    persist_graph_job(job)
+
+def load_shared_graph_job(job_id: str):
+    if not re.fullmatch(r"[0-9a-f]{16}", job_id or ""):
+        return None
+
+    path = graph_job_path(job_id)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return result
+
+def get_graph_job(job_id: str, selected_object: str = "") -> dict:
+    with _graph_jobs_lock:
+        job = _graph_jobs.get(job_id)
+        if job is not None:
+            job["last_seen"] = time.time()
+            result = graph_job_snapshot(job)
+            graph = job["graph"]
+
+    if job is None:
+        result = load_shared_graph_job(job_id)
+        if result is None:
+            return None
+        graph = load_cached_graph(result.pop("cache_key"))[0] if result["status"] == "done" else None
+
+    if graph is not None:
+        result["graph"] = apply_graph_selection(graph, selected_object)
+        result["graph"]["meta"]["cache"] = "job"
+    return result
 
 @app.route('/project-knowledge-graph', methods=['POST'])
 def project_knowledge_graph():
     data = request.json or {}
     project_dir = data.get("project_dir", "").strip()
     object_name = data.get("object_name", "").strip()
+    enrich = data.get("enrich")
+    client_id = data.get("client_id") if isinstance(data.get("client_id"), str) else ""
 
     if not project_dir:
         return jsonify({"error": "Project directory is required."}), 400
 
     try:
-        graph = build_project_knowledge_graph(project_dir, object_name)
+        graph = build_project_knowledge_graph(project_dir, object_name, None if enrich is None else bool(enrich), client_id)
         return jsonify(graph)
     except Exception as e:
         return jsonify({"error": f"Error while creating the project knowledge graph: {e}"}), 500
 
+@app.route('/project-knowledge-graph-job', methods=['POST'])
+def project_knowledge_graph_job():
+    data = request.json or {}
+    job_id = data.get("job_id", "").strip()
+    object_name = data.get("object_name", "").strip()
+
+    if not job_id:
+        return jsonify({"error": "Job id is required."}), 400
+
+    job = get_graph_job(job_id, object_name)
+    if job is None:
+        return jsonify({"error": "Unknown or expired graph job."}), 404
+
+    return jsonify(job)
+
 HTML_CONTENT = """
 <!DOCTYPE html>
 <html lang="en">
@@ -1332,6 +4128,54 @@ document.addEventListener('DOMContentLoaded', function() {
     let projectGraphDataCache = null;
     let projectGraphNodes = null;
     let projectGraphEdges = null;
+    let projectGraphJobId = null;
+    let replacedProjectGraphJobId = null;
+    const graphClientId = newRequestId();
+    let projectGraphController = null;
+    let activeChatRequest = null;
+    const GRAPH_JOB_POLL_MS = 2000;
+
+    function newRequestId() {
+        if (window.crypto && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        return Date.now().toString(36) + Math.random().toString(36).slice(2);
+    }
+
+    function cancelServerRequest(requestId, clientId = '') {
+        if (!requestId) return;
+
+        const body = JSON.stringify({ request_id: requestId, client_id: clientId });
+        if (navigator.sendBeacon && navigator.sendBeacon('/cancel-request', body)) return;
+
+        fetch('/cancel-request', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: body,
+            keepalive: true
+        }).catch(() => {});
+    }
+
+    function detachProjectGraphJob() {
+        replacedProjectGraphJobId = projectGraphJobId || replacedProjectGraphJobId;
+        projectGraphJobId = null;
+    }
+
+    function releaseReplacedProjectGraphJob(nextJobId = null) {
+        if (replacedProjectGraphJobId && replacedProjectGraphJobId !== nextJobId) {
+            cancelServerRequest(replacedProjectGraphJobId, graphClientId);
+        }
+        replacedProjectGraphJobId = null;
+    }
+
+    window.addEventListener('pagehide', () => {
+        if (activeChatRequest) {
+            cancelServerRequest(activeChatRequest.id);
+            activeChatRequest.controller.abort();
+        }
+        cancelServerRequest(projectGraphJobId, graphClientId);
+        cancelServerRequest(replacedProjectGraphJobId, graphClientId);
+    });
 
     projectDirInput.addEventListener('blur', async () => {
         const projectDir = projectDirInput.value.trim();
@@ -1339,6 +4183,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
         try {
             projectGraphDataCache = null;
+            detachProjectGraphJob();
             destroyProjectKnowledgeGraph();
             clearGraphConnectionInfo();
 
@@ -1588,49 +4433,30 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
-    function renderProjectKnowledgeGraph(graphData, selectedObject = '') {
-        if (!projectKnowledgeGraph) return;
-
-        if (!window.vis) {
-            projectKnowledgeGraph.style.display = 'block';
-            projectKnowledgeGraph.innerHTML = '<div class="error">vis-network wurde nicht geladen.</div>';
-            return;
-        }
-
-        if (!graphData || !Array.isArray(graphData.nodes) || graphData.nodes.length === 0) {
-            destroyProjectKnowledgeGraph();
-            projectKnowledgeGraph.style.display = 'block';
-            projectKnowledgeGraph.innerHTML = '<div class="error">Keine verknüpften Objekte gefunden.</div>';
-            return;
-        }
-
-        destroyProjectKnowledgeGraph();
-
-        projectGraphDataCache = graphData;
-
-        projectGraphNodes = new vis.DataSet((graphData.nodes || []).map(n => {
-            const isSelected = Boolean(n.is_selected) || (selectedObject && n.id === selectedObject);
+    function buildVisNode(n, selectedObject = '') {
+        const isSelected = Boolean(n.is_selected) || (selectedObject && n.id === selectedObject);
 
-            return {
-                id: n.id,
-                label: n.label || n.id,
-                title: n.title || n.label || n.id,
-                shape: 'dot',
-                size: isSelected ? 24 : 18,
-                borderWidth: isSelected ? 4 : 2,
-                color: {
-                    background: '#ffffff',
-                    border: isSelected ? '#00FFCC' : '#262626',
-                    highlight: { background: '#ffffff', border: isSelected ? '#00FFCC' : '#262626' },
-                    hover: { background: '#ffffff', border: isSelected ? '#00FFCC' : '#262626' }
-                },
-                font: {
-                    color: '#262626'
-                }
-            };
-        }));
+        return {
+            id: n.id,
+            label: n.label || n.id,
+            title: n.title || n.label || n.id,
+            shape: n.type === 'room' ? 'box' : 'dot',
+            size: isSelected ? 24 : 18,
+            borderWidth: isSelected ? 4 : 2,
+            color: {
+                background: '#ffffff',
+                border: isSelected ? '#00FFCC' : '#262626',
+                highlight: { background: '#ffffff', border: isSelected ? '#00FFCC' : '#262626' },
+                hover: { background: '#ffffff', border: isSelected ? '#00FFCC' : '#262626' }
+            },
+            font: {
+                color: '#262626'
+            }
+        };
+    }
 
-        projectGraphEdges = new vis.DataSet((graphData.edges || []).map((e, index) => ({
+    function buildVisEdge(e, index = 0) {
+        return {
             id: e.id || `${e.from}__${e.to}__${e.label || 'related_to'}__${index}`,
             from: e.from,
             to: e.to,
@@ -1659,7 +4485,64 @@ document.addEventListener('DOMContentLoaded', function() {
                 color: '#262626',
                 size: 12
             }
-        })));
+        };
+    }
+
+    function applyProjectGraphPatch(patch, selectedObject = '') {
+        if (!patch || !projectGraphNetwork || !projectGraphDataCache) return false;
+
+        const removed = new Set(patch.removed || []);
+        const changed = new Map([...(patch.added || []), ...(patch.updated || [])].map(e => [e.id, e]));
+
+        const edges = (projectGraphDataCache.edges || []).filter(e => !removed.has(e.id) && !changed.has(e.id));
+        edges.push(...changed.values());
+
+        const knownNodes = new Map((projectGraphDataCache.nodes || []).map(n => [n.id, n]));
+        (patch.nodes || []).forEach(n => {
+            if (!knownNodes.has(n.id)) knownNodes.set(n.id, n);
+        });
+
+        const connected = new Set(selectedObject ? [selectedObject] : []);
+        edges.forEach(e => {
+            connected.add(e.from);
+            connected.add(e.to);
+        });
+
+        const nodes = [...knownNodes.values()].filter(n => connected.has(n.id));
+        const staleNodeIds = projectGraphNodes.getIds().filter(id => !connected.has(id));
+
+        projectGraphEdges.remove([...removed].filter(id => projectGraphEdges.get(id)));
+        projectGraphEdges.update([...changed.values()].map(e => buildVisEdge(e)));
+        projectGraphNodes.update(nodes.filter(n => !projectGraphNodes.get(n.id)).map(n => buildVisNode(n, selectedObject)));
+        projectGraphNodes.remove(staleNodeIds);
+
+        projectGraphDataCache = { ...projectGraphDataCache, nodes: nodes, edges: edges };
+        updateProjectKnowledgeGraphSelection(selectedObject);
+        return true;
+    }
+
+    function renderProjectKnowledgeGraph(graphData, selectedObject = '') {
+        if (!projectKnowledgeGraph) return;
+
+        if (!window.vis) {
+            projectKnowledgeGraph.style.display = 'block';
+            projectKnowledgeGraph.innerHTML = '<div class="error">vis-network wurde nicht geladen.</div>';
+            return;
+        }
+
+        if (!graphData || !Array.isArray(graphData.nodes) || graphData.nodes.length === 0) {
+            destroyProjectKnowledgeGraph();
+            projectKnowledgeGraph.style.display = 'block';
+            projectKnowledgeGraph.innerHTML = '<div class="error">Keine verknüpften Objekte gefunden.</div>';
+            return;
+        }
+
+        destroyProjectKnowledgeGraph();
+
+        projectGraphDataCache = graphData;
+
+        projectGraphNodes = new vis.DataSet((graphData.nodes || []).map(n => buildVisNode(n, selectedObject)));
+        projectGraphEdges = new vis.DataSet((graphData.edges || []).map((e, index) => buildVisEdge(e, index)));
 
         const options = {
             interaction: {
@@ -1746,6 +4629,12 @@ document.addEventListener('DOMContentLoaded', function() {
             projectGraphTitle.style.display = 'block';
         }
 
+        detachProjectGraphJob();
+        if (projectGraphController) {
+            projectGraphController.abort();
+        }
+        const controller = new AbortController();
+        projectGraphController = controller;
         projectKnowledgeGraph.style.display = 'block';
         projectKnowledgeGraph.innerHTML = '<p style="padding:12px;">KNOWLEDGE GRAPH WILL BE UPDATED ...</p>';
 
@@ -1755,8 +4644,10 @@ document.addEventListener('DOMContentLoaded', function() {
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     project_dir: projectDir,
-                    object_name: effectiveSelection
-                })
+                    object_name: effectiveSelection,
+                    client_id: graphClientId
+                }),
+                signal: controller.signal
             });
 
             const data = await res.json();
@@ -1767,10 +4658,80 @@ document.addEventListener('DOMContentLoaded', function() {
 
             projectGraphDataCache = data;
             renderProjectKnowledgeGraph(projectGraphDataCache, effectiveSelection);
+
+            const job = data.meta && data.meta.job;
+            releaseReplacedProjectGraphJob(job ? job.id : null);
+            if (job && (job.status === 'queued' || job.status === 'running')) {
+                pollProjectGraphJob(job.id, projectDir);
+            }
         } catch (error) {
+            if (error.name === 'AbortError') return;
+            releaseReplacedProjectGraphJob();
             console.error("Error while loading knowledge graph:", error);
             projectKnowledgeGraph.style.display = 'block';
             projectKnowledgeGraph.innerHTML = `<div class="error">Fehler beim Laden des Wissensgraphen: ${escapeHtml(error.message || "Unbekannter Fehler")}</div>`;
+        } finally {
+            if (projectGraphController === controller) {
+                projectGraphController = null;
+            }
+        }
+    }
+
+    function upgradeProjectKnowledgeGraph(graphData, selectedObject = '') {
+        if (!projectGraphNetwork || !graphData || !Array.isArray(graphData.nodes) || graphData.nodes.length === 0) {
+            renderProjectKnowledgeGraph(graphData, selectedObject);
+            return;
+        }
+
+        const nodeIds = new Set(graphData.nodes.map(n => n.id));
+        const edges = (graphData.edges || []).map((e, index) => buildVisEdge(e, index));
+        const edgeIds = new Set(edges.map(e => e.id));
+
+        projectGraphEdges.remove(projectGraphEdges.getIds().filter(id => !edgeIds.has(id)));
+        projectGraphNodes.remove(projectGraphNodes.getIds().filter(id => !nodeIds.has(id)));
+        projectGraphNodes.update(graphData.nodes.map(n => buildVisNode(n, selectedObject)));
+        projectGraphEdges.update(edges);
+
+        projectGraphDataCache = graphData;
+        updateProjectKnowledgeGraphSelection(selectedObject);
+    }
+
+    async function pollProjectGraphJob(jobId, projectDir) {
+        projectGraphJobId = jobId;
+
+        while (projectGraphJobId === jobId) {
+            await new Promise(resolve => setTimeout(resolve, GRAPH_JOB_POLL_MS));
+            if (projectGraphJobId !== jobId || projectDirInput.value.trim() !== projectDir) return;
+
+            try {
+                const res = await fetch('/project-knowledge-graph-job', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        job_id: jobId,
+                        object_name: objectSelect.value || ''
+                    })
+                });
+
+                const data = await res.json();
+                if (projectGraphJobId !== jobId) return;
+
+                if (data.error || data.status === 'failed' || data.status === 'cancelled') {
+                    console.warn("Graph enrichment failed:", data.error);
+                    projectGraphJobId = null;
+                    return;
+                }
+
+                if (data.status === 'done') {
+                    projectGraphJobId = null;
+                    upgradeProjectKnowledgeGraph(data.graph, objectSelect.value || '');
+                    return;
+                }
+            } catch (error) {
+                console.error("Error while polling graph job:", error);
+                projectGraphJobId = null;
+                return;
+            }
         }
     }
 
@@ -1843,8 +4804,11 @@ document.addEventListener('DOMContentLoaded', function() {
             }
 
             showMessage("Saved successfully: " + currentEventFilename, 'success', 2500);
-            projectGraphDataCache = null;
-            await refreshProjectKnowledgeGraph(objectName, true);
+
+            if (!applyProjectGraphPatch(data.graph_patch, objectName)) {
+                projectGraphDataCache = null;
+                await refreshProjectKnowledgeGraph(objectName, true);
+            }
         } catch (error) {
             console.error("Error while saving event content:", error);
             showError("An error occurred while saving the event.");
@@ -2157,6 +5121,144 @@ document.addEventListener('DOMContentLoaded', function() {
         chatOutput.scrollTop = chatOutput.scrollHeight;
     }
 
+    function parseSseEvent(rawEvent) {
+        let eventName = 'message';
+        const dataLines = [];
+
+        rawEvent.split('\\n').forEach(line => {
+            if (line.startsWith('event:')) {
+                eventName = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
+            }
+        });
+
+        let data = {};
+        try {
+            data = dataLines.length ? JSON.parse(dataLines.join('\\n')) : {};
+        } catch (err) {
+            console.error('Invalid stream event:', err);
+        }
+
+        return { event: eventName, data: data };
+    }
+
+    async function readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true }).split('\\r\\n').join('\\n');
+
+            let boundary = buffer.indexOf('\\n\\n');
+            while (boundary !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                if (rawEvent.trim() && onEvent(parseSseEvent(rawEvent)) === false) {
+                    reader.cancel();
+                    return;
+                }
+
+                boundary = buffer.indexOf('\\n\\n');
+            }
+        }
+    }
+
+    function createStreamingAssistantMessage() {
+        const parts = createChatMessage('assistant', 'GAMMA:');
+        const cursor = '<span class="typing-cursor">|</span>';
+        let renderScheduled = false;
+        let finished = false;
+
+        const message = {
+            text: '',
+            append(token) {
+                message.text += token;
+                if (renderScheduled || finished) return;
+
+                renderScheduled = true;
+                requestAnimationFrame(() => {
+                    renderScheduled = false;
+                    if (finished) return;
+                    parts.body.innerHTML = renderMarkdown(message.text) + cursor;
+                    attachChatEnhancements(parts.body);
+                    chatOutput.scrollTop = chatOutput.scrollHeight;
+                });
+            },
+            finish(fallbackText = '') {
+                finished = true;
+                parts.body.innerHTML = renderMarkdown(message.text || fallbackText);
+                attachChatEnhancements(parts.body);
+                chatOutput.scrollTop = chatOutput.scrollHeight;
+            }
+        };
+
+        return message;
+    }
+
+    async function streamAssistantMessage(payload, loadingNode, signal) {
+        const res = await fetch('/project-chat-stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload),
+            signal: signal
+        });
+
+        const contentType = res.headers.get('Content-Type') || '';
+        if (!contentType.includes('text/event-stream')) {
+            const data = await res.json();
+            throw new Error(data.error || 'Keine Antwort erhalten.');
+        }
+
+        let message = null;
+        let streamError = null;
+
+        await readEventStream(res, evt => {
+            if (evt.event === 'error') {
+                streamError = evt.data.error || 'Unbekannter Fehler';
+                return false;
+            }
+
+            if (evt.event === 'done') {
+                return false;
+            }
+
+            if (evt.event === 'meta') {
+                console.debug('Prompt budget:', evt.data.budget);
+                return;
+            }
+
+            if (evt.data.token) {
+                if (!message) {
+                    removeLoadingMessage(loadingNode);
+                    message = createStreamingAssistantMessage();
+                }
+                message.append(evt.data.token);
+            }
+        });
+
+        if (streamError && !message) {
+            throw new Error(streamError);
+        }
+
+        if (!message) {
+            removeLoadingMessage(loadingNode);
+            message = createStreamingAssistantMessage();
+        }
+
+        if (streamError) {
+            showError(streamError);
+        }
+
+        message.finish();
+        return message;
+    }
+
     function attachCopyHandlers(container) {
         const copyButtons = container.querySelectorAll('.copy-code-btn');
 
@@ -2210,35 +5312,31 @@ document.addEventListener('DOMContentLoaded', function() {
         chatInput.disabled = true;
 
         const loadingNode = addLoadingMessage();
+        let streamedMessage = null;
+        const chatRequest = { id: newRequestId(), controller: new AbortController() };
+        activeChatRequest = chatRequest;
 
         try {
-            const res = await fetch('/project-chat', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    project_dir: projectDir,
-                    object_name: objectName,
-                    message: message
-                })
-            });
-
-            const data = await res.json();
-            removeLoadingMessage(loadingNode);
+            streamedMessage = await streamAssistantMessage({
+                project_dir: projectDir,
+                object_name: objectName,
+                message: message,
+                request_id: chatRequest.id
+            }, loadingNode, chatRequest.controller.signal);
 
-            if (data.error) {
-                showError(data.error);
-                await typewriterAssistantMessage("Fehler: " + data.error, 8);
-                return;
+            if (!streamedMessage.text) {
+                streamedMessage.finish('Keine Antwort erhalten.');
             }
 
-            await typewriterAssistantMessage(data.answer || 'Keine Antwort erhalten.', 6);
-
         } catch (error) {
             console.error("Error while sending chat message:", error);
             removeLoadingMessage(loadingNode);
-            showError("An error occurred while sending the chat request.");
-            await typewriterAssistantMessage("Fehler beim Senden der Anfrage.", 8);
+            showError(error.message || "An error occurred while sending the chat request.");
+            await typewriterAssistantMessage("Fehler: " + (error.message || "Fehler beim Senden der Anfrage."), 8);
         } finally {
+            if (activeChatRequest === chatRequest) {
+                activeChatRequest = null;
+            }
             sendChatBtn.classList.remove('send-disabled');
             sendChatBtn.disabled = false;
             chatInput.disabled = false;
@@ -2260,5 +5358,259 @@ def styles():
 def script():
     return Response(JS_CONTENT, mimetype='application/javascript')
 
+async def read_asgi_json(receive) -> dict:
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return json.loads(body or b"{}")
+
+async def send_asgi_json(send, data: dict, status: int = 200):
+    body = json.dumps(data).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def watch_asgi_disconnect(receive, handle: dict):
+    message = asyncio.ensure_future(receive())
+    try:
+        while not model_request_cancelled(handle):
+            done, _ = await asyncio.wait({message}, timeout=MODEL_CANCEL_POLL_SEC)
+            if not done:
+                continue
+            if message.result()["type"] == "http.disconnect":
+                trigger_model_request_cancel(handle)
+                return
+            message = asyncio.ensure_future(receive())
+    finally:
+        message.cancel()
+
+async def run_cancellable_asgi(receive, handle: dict, coro):
+    loop = asyncio.get_running_loop()
+    work = asyncio.ensure_future(coro)
+
+    def closer():
+        loop.call_soon_threadsafe(work.cancel)
+
+    add_model_request_closer(handle, closer)
+    watcher = asyncio.ensure_future(watch_asgi_disconnect(receive, handle))
+    try:
+        await asyncio.wait({work})
+    finally:
+        watcher.cancel()
+        remove_model_request_closer(handle, closer)
+        if not work.done():
+            work.cancel()
+
+    if work.cancelled():
+        raise RuntimeError("Model call was cancelled.")
+    return work.result()
+
+async def asgi_project_chat(scope, receive, send):
+    chat, error = await asyncio.to_thread(prepare_project_chat, await read_asgi_json(receive))
+    if error:
+        await send_asgi_json(send, {"error": error}, 400)
+        return
+
+    if chat["cached"]:
+        await send_asgi_json(send, {"answer": chat["cached"]["answer"], "meta": {"cache": chat_cache_meta(chat["cached"])}})
+        return
+
+    summary_entry = chat["summary_entry"]
+    assembled = await asyncio.to_thread(
+        build_project_chat_prompt, chat["project_dir"], chat["object_name"], summary_entry, chat["user_message"]
+    )
+
+    handle = open_model_request(chat["request_id"])
+    try:
+        answer = await run_cancellable_asgi(
+            receive,
+            handle,
+            async_call_ollama_cloud(assembled["prompt"], num_ctx=assembled["num_ctx"], project_dir=chat["project_dir"])
+        )
+    except Exception as e:
+        await send_asgi_json(send, {"error": f"Ollama-Cloud-Error: {e}"}, 500)
+        return
+    finally:
+        close_model_request(handle)
+
+    store_chat_cache(summary_entry["content_hash"], chat["object_name"], chat["user_message"], answer)
+    await send_asgi_json(send, {"answer": answer, "meta": {"budget": assembled["budget"], "cache": chat_cache_meta()}})
+
+async def asgi_project_chat_stream(scope, receive, send):
+    chat, error = await asyncio.to_thread(prepare_project_chat, await read_asgi_json(receive))
+    if error:
+        await send_asgi_json(send, {"error": error}, 400)
+        return
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream")] + [
+            (name.lower().encode(), value.encode()) for name, value in SSE_HEADERS.items()
+        ]
+    })
+
+    async def emit(text: str):
+        await send({"type": "http.response.body", "body": text.encode("utf-8"), "more_body": True})
+
+    if chat["cached"]:
+        for event in cached_chat_events(chat["cached"]):
+            await emit(event)
+    else:
+        summary_entry = chat["summary_entry"]
+        assembled = await asyncio.to_thread(
+            build_project_chat_prompt, chat["project_dir"], chat["object_name"], summary_entry, chat["user_message"]
+        )
+        await emit(format_sse({"budget": assembled["budget"], "cache": chat_cache_meta()}, event="meta"))
+
+        feed, finish = make_stream_cleaner()
+
+        async def stream_answer():
+            ticket = await acquire_model_slot_async(chat["project_dir"], MODEL_PRIORITY_INTERACTIVE)
+            try:
+                parts = []
+                async for chunk in async_stream_ollama_cloud(assembled["prompt"], num_ctx=assembled["num_ctx"], ticket=ticket):
+                    token = feed(chunk)
+                    if token:
+                        parts.append(token)
+                        await emit(format_sse({"token": token}))
+                token = finish()
+                if token:
+                    parts.append(token)
+                    await emit(format_sse({"token": token}))
+                store_chat_cache(summary_entry["content_hash"], chat["object_name"], chat["user_message"], "".join(parts).strip())
+            finally:
+                release_model_slot(ticket)
+
+        handle = open_model_request(chat["request_id"])
+        try:
+            await run_cancellable_asgi(receive, handle, stream_answer())
+            await emit(format_sse({}, event="done"))
+        except Exception as e:
+            await emit(format_sse({"error": f"Ollama-Cloud-Error: {e}"}, event="error"))
+        finally:
+            close_model_request(handle)
+
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+ASGI_ROUTES = {
+    "/project-chat": asgi_project_chat,
+    "/project-chat-stream": asgi_project_chat_stream
+}
+_asgi_wsgi_bridge = None
+
+def get_asgi_wsgi_bridge():
+    global _asgi_wsgi_bridge
+
+    if _asgi_wsgi_bridge is None:
+        try:
+            from asgiref.wsgi import WsgiToAsgi
+            _asgi_wsgi_bridge = WsgiToAsgi(app)
+        except ImportError:
+            try:
+                from uvicorn.middleware.wsgi import WSGIMiddleware
+                _asgi_wsgi_bridge = WSGIMiddleware(app)
+            except ImportError:
+                pass
+    return _asgi_wsgi_bridge
+
+async def asgi_app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await close_async_ollama_client()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    handler = ASGI_ROUTES.get(scope.get("path")) if scope["type"] == "http" and scope.get("method") == "POST" else None
+    if handler is not None and httpx is not None:
+        started = time.perf_counter()
+        response = {"status": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            await send(message)
+
+        try:
+            await handler(scope, receive, send_with_status)
+        finally:
+            record_request_metrics(scope["path"], "POST", response["status"], started)
+        return
+
+    bridge = get_asgi_wsgi_bridge()
+    if bridge is None:
+        await send_asgi_json(send, {"error": "Install asgiref or uvicorn to serve the remaining routes over ASGI."}, 500)
+        return
+    await bridge(scope, receive, send)
+
+def serve(argv=None):
+    parser = argparse.ArgumentParser(prog="app.py serve", description="Run GAMMA with a production WSGI server.")
+    parser.add_argument("--host", default=os.getenv("GAMMA_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("GAMMA_PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("GAMMA_WORKERS", "2")))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("GAMMA_THREADS", "16")))
+    parser.add_argument("--asgi", action="store_true", help="serve the chat routes with the async model client (needs uvicorn and httpx)")
+    args = parser.parse_args(argv)
+    workers = max(1, args.workers)
+    threads = max(1, args.threads)
+    if workers > 1:
+        # Worker processes pass cancels to each other through marker files.
+        os.environ["GAMMA_SHARED_CANCEL"] = "1"
+
+    if args.asgi:
+        try:
+            import uvicorn
+        except ImportError:
+            raise SystemExit("--asgi needs the optional uvicorn package.")
+        if httpx is None:
+            raise SystemExit("--asgi needs the optional httpx package.")
+        uvicorn.run("app:asgi_app", host=args.host, port=args.port, workers=workers, app_dir=APP_DIR)
+        return
+
+    try:
+        import gunicorn
+    except ImportError:
+        gunicorn = None
+
+    if gunicorn is not None and os.name != "nt":
+        os.execvp(sys.executable, [
+            sys.executable, "-m", "gunicorn",
+            "--chdir", APP_DIR,
+            "--bind", f"{args.host}:{args.port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--worker-class", "gthread",
+            "--timeout", str(int(OLLAMA_TIMEOUT_SEC + OLLAMA_QUEUE_TIMEOUT_SEC + 30)),
+            "app:app"
+        ])
+
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+
+    if waitress_serve is not None:
+        print(f"Serving GAMMA with waitress on http://{args.host}:{args.port} ({workers * threads} threads)")
+        waitress_serve(app, host=args.host, port=args.port, threads=workers * threads, channel_timeout=OLLAMA_TIMEOUT_SEC)
+        return
+
+    print("Neither gunicorn nor waitress is installed, falling back to the threaded Flask server.")
+    app.run(host=args.host, port=args.port, threaded=True, debug=False)
+
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve(sys.argv[2:])
+    else:
+        app.run(debug=True)
\ No newline at end of file
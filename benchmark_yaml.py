@@ -0,0 +1,103 @@
+"""
+Compares the pure-Python YAML path with the libyaml fast path used by
+the project summary builder on a synthetic GameMaker project.
+
+Usage: python benchmark_yaml.py [--objects 200] [--events 12] [--repeat 3]
+"""
+
+import os, sys, time, shutil, argparse, tempfile
+import yaml
+
+os.environ.setdefault("OLLAMA_CLOUD_API_KEY", "benchmark")
+
+import app
+
+GML_SNIPPET = """// movement
+var _dx = keyboard_check(vk_right) - keyboard_check(vk_left);
+var _dy = keyboard_check(vk_down) - keyboard_check(vk_up);
+x += _dx * move_speed;
+y += _dy * move_speed;
+if (place_meeting(x, y, obj_enemy_{index})) {{
+    hp -= 1;
+    instance_create_layer(x, y, "Instances", obj_hit_effect);
+}}
+"""
+
+
+def create_synthetic_project(root: str, objects: int, events: int):
+    for obj_index in range(objects):
+        obj_dir = os.path.join(root, "objects", f"obj_synthetic_{obj_index}")
+        os.makedirs(obj_dir, exist_ok=True)
+
+        for event_index in range(events):
+            path = os.path.join(obj_dir, f"Other_{event_index}.yml")
+            data = {
+                "resourceType": "GMEvent",
+                "eventNum": event_index,
+                "eventType": 7,
+                "isDnD": False,
+                "tags": [f"tag_{i}" for i in range(8)]
+            }
+            if event_index % 2 == 0:
+                data["gml"] = GML_SNIPPET.format(index=event_index)
+
+            with open(path, "w", encoding="utf-8") as f:
+                yaml.safe_dump(data, f)
+
+
+def load_texts(root: str) -> list:
+    texts = []
+    for dirpath, _, files in os.walk(os.path.join(root, "objects")):
+        for fname in sorted(files):
+            with open(os.path.join(dirpath, fname), "r", encoding="utf-8") as f:
+                texts.append(f.read())
+    return texts
+
+
+def pure_python_path(text: str) -> str:
+    data = yaml.safe_load(text) or {}
+    return data.get("gml", "") or ""
+
+
+def fast_path(text: str) -> str:
+    return app.extract_yaml_gml(text)
+
+
+def time_best(func, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=200)
+    parser.add_argument("--events", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="gamma_bench_")
+    try:
+        create_synthetic_project(root, args.objects, args.events)
+        texts = load_texts(root)
+
+        assert [pure_python_path(t) for t in texts] == [fast_path(t) for t in texts]
+
+        slow = time_best(lambda: [pure_python_path(t) for t in texts], args.repeat)
+        fast = time_best(lambda: [fast_path(t) for t in texts], args.repeat)
+
+        print(f"files:               {len(texts)}")
+        print(f"libyaml available:   {app.YAML_LOADER is not yaml.SafeLoader}")
+        print(f"yaml.safe_load:      {slow * 1000:9.1f} ms")
+        print(f"fast path:           {fast * 1000:9.1f} ms")
+        print(f"speedup:             {slow / fast:9.1f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())